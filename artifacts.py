@@ -0,0 +1,175 @@
+"""Per-level heuristic tables shared between processes.
+
+The UID heuristic builds the same tables for every level in every process
+that solves it: open-cell and dead-square maps, push distances to each
+goal, and the corridor escape maps (see hw3.levelTables). A Registry
+builds them once in the parent and publishes each level's tables as one
+multiprocessing.shared_memory segment, named after the level hash and a
+nonce of the registry so that registries in different processes never
+collide. Workers call install(key) to attach to the segment and seed
+hw3.levelCache with read-only NumPy views of it, instead of rebuilding
+the tables, so every worker reads the one shared copy.
+
+Segment layout: an 8-byte little-endian header length, a JSON header
+listing (name, dtype, shape, offset) for each array, then the array data
+at 8-byte aligned offsets.
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import struct
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+import hw3
+
+PREFIX = 'sokoban_'
+ALIGN = 8
+
+# Segments attached by this process, kept open for as long as their views are in use.
+attached = {}
+# Hashes of the segments created by Registry objects in this process.
+published = set()
+
+
+def level_hash(s):
+    """
+    :param s: any state of the level
+    :return: a hex digest of the level's shape, walls and goals
+    """
+    shape, walls, goals = hw3.levelKey(np.asarray(s))
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(struct.pack('<2q', *shape))
+    digest.update(walls)
+    digest.update(goals)
+    return digest.hexdigest()
+
+
+def build(s):
+    """
+    :param s: any state of the level
+    :return: the level's tables as a dict of NumPy arrays
+    """
+    s = np.asarray(s)
+    # Leave nothing behind in hw3.levelCache for forked workers to inherit; they attach instead.
+    t = hw3.levelCache.get(hw3.levelKey(s)) or hw3.buildLevelTables(s)
+    corridor = sorted(t['escape'])
+    return {
+        'walls': (s == hw3.wall),
+        'goalMask': (s == hw3.star) | (s == hw3.boxstar) | (s == hw3.keeperstar),
+        'open': np.array(t['open'], dtype=bool),
+        'goals': np.array(t['goals'], dtype=np.int32),
+        'goalDist': np.array(t['goalDist'], dtype=np.int32).reshape(len(t['goals']), len(t['open'])),
+        'dead': np.array(t['dead'], dtype=bool),
+        'corridor': np.array(corridor, dtype=np.int32),
+        'escape': np.array([t['escape'][p] for p in corridor], dtype=bool).reshape(len(corridor), len(t['open'])),
+    }
+
+
+def pack(arrays):
+    entries = []
+    offset = 0
+    for name, a in arrays.items():
+        entries.append([name, a.dtype.str, list(a.shape), offset])
+        offset += -(-a.nbytes // ALIGN) * ALIGN
+    header = json.dumps(entries).encode()
+    start = -(-(8 + len(header)) // ALIGN) * ALIGN
+    return header, start, start + offset
+
+
+def views(buf):
+    (length,) = struct.unpack_from('<Q', buf, 0)
+    entries = json.loads(bytes(buf[8:8 + length]))
+    start = -(-(8 + length) // ALIGN) * ALIGN
+    arrays = {}
+    for name, dtype, shape, offset in entries:
+        a = np.ndarray(shape, dtype=np.dtype(dtype), buffer=buf, offset=start + offset)
+        a.flags.writeable = False
+        arrays[name] = a
+    return arrays
+
+
+class Registry:
+    def __init__(self):
+        """
+        Owner of the published segments; close() (or leaving the with block) unlinks them.
+        """
+        self.nonce = '{}_{}'.format(os.getpid(), secrets.token_hex(4))
+        self.segments = {}
+
+    def publish(self, s):
+        """
+        :param s: any state of the level
+        :return: the key workers pass to attach/install: the registry's nonce and the level hash
+        """
+        key = '{}_{}'.format(self.nonce, level_hash(s))
+        if key in self.segments:
+            return key
+        arrays = build(s)
+        header, start, size = pack(arrays)
+        shm = shared_memory.SharedMemory(name=PREFIX + key, create=True, size=size)
+        struct.pack_into('<Q', shm.buf, 0, len(header))
+        shm.buf[8:8 + len(header)] = header
+        for (name, a), target in zip(arrays.items(), views(shm.buf).values()):
+            target.flags.writeable = True
+            target[...] = a
+        self.segments[key] = shm
+        published.add(key)
+        return key
+
+    def close(self):
+        for key, shm in self.segments.items():
+            attached.pop(key, None)
+            published.discard(key)
+            shm.close()
+            shm.unlink()
+        self.segments.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(key):
+    """
+    :param key: a key returned by Registry.publish
+    :return: the level's tables as a dict of read-only NumPy views into shared memory
+    """
+    if key not in attached:
+        shm = shared_memory.SharedMemory(name=PREFIX + key)
+        # The publishing process owns the segment; keep the resource tracker from
+        # unlinking it when this process exits.
+        if key not in published:
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        attached[key] = (shm, views(shm.buf))
+    return attached[key][1]
+
+
+def install(key):
+    """
+    Seed hw3.levelCache with the shared tables of a level, so that h905751487 does not rebuild them.
+
+    :param key: a key returned by Registry.publish
+    """
+    a = attach(key)
+    walls, goal_mask = a['walls'], a['goalMask']
+    cache_key = (walls.shape, walls.tobytes(), goal_mask.tobytes())
+    if cache_key in hw3.levelCache:
+        return
+    goals = a['goals'].tolist()
+    hw3.cachePut(hw3.levelCache, cache_key, {
+        'width': walls.shape[1] + 2,
+        'open': a['open'],
+        'goals': goals,
+        'goalIndex': {g: i for i, g in enumerate(goals)},
+        'goalDist': list(a['goalDist']),
+        'dead': a['dead'],
+        'escape': dict(zip(a['corridor'].tolist(), a['escape'])),
+        'boxCache': OrderedDict(),
+    }, hw3.LEVEL_CACHE_SIZE)
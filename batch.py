@@ -0,0 +1,166 @@
+"""Solve collections of levels in worker processes.
+
+solve_many() spreads levels over a ProcessPoolExecutor and yields one
+BatchResult per level as soon as it is known. Every level gets its own
+expansion and time budget, and optionally an address-space cap in the
+worker. A worker that dies (a hard crash, or the kernel's OOM killer)
+breaks the shared pool; the levels that were in flight at that point are
+retried one per single-worker pool, so only the level that actually
+crashes is reported as 'crashed'.
+
+With a solcache.SolutionCache, levels already in the cache are reported
+as 'cached' without being searched, and new solutions are added to it.
+"""
+
+import os
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import artifacts
+import search
+from hw3 import SolveResult, solve
+
+# status is one of 'solved', 'cached', 'unsolvable', 'budget', 'timeout', 'memory', 'crashed' or 'error';
+# 'budget' means the expansion budget ran out and 'timeout' the time budget.
+# solution is the hw3.SolveResult of a solved or cached level, or None; its states() replays the moves.
+# generated and expanded are None when the search did not report them (an unsolvable level in solve_one).
+BatchResult = namedtuple('BatchResult', ['index', 'status', 'solution', 'depth', 'generated', 'expanded',
+                                         'seconds', 'error'])
+
+
+def limit_memory(nbytes):
+    import resource
+    resource.setrlimit(resource.RLIMIT_AS, (nbytes, nbytes))
+
+
+def solve_one(index, level, heuristic, max_expanded=None, time_limit=None, tables_key=None):
+    """
+    Solve one level in the current process.
+
+    :param tables_key: if given, attach to the level's tables published by an artifacts.Registry under this key
+    :return: a BatchResult
+    """
+    start = time.perf_counter()
+    if tables_key is not None:
+        artifacts.install(tables_key)
+    try:
+        solution = solve(level, heuristic, max_expanded=max_expanded, time_limit=time_limit)
+    except search.TimeBudgetExceeded as e:
+        return BatchResult(index, 'timeout', None, None, e.node_generated, e.node_expanded,
+                           time.perf_counter() - start, str(e))
+    except search.BudgetExceeded as e:
+        return BatchResult(index, 'budget', None, None, e.node_generated, e.node_expanded,
+                           time.perf_counter() - start, str(e))
+    except MemoryError:
+        return BatchResult(index, 'memory', None, None, None, None, time.perf_counter() - start,
+                           'out of memory')
+    seconds = time.perf_counter() - start
+    if solution is None:
+        return BatchResult(index, 'unsolvable', None, None, None, None, seconds, None)
+    return BatchResult(index, 'solved', solution, solution.depth, solution.generated, solution.expanded,
+                       seconds, None)
+
+
+def search_result(index, start_state, node, generated, expanded, seconds):
+    """
+    :param node: the goal node of a search that recorded its moves (hw3.next_moves), or None
+    :return: the BatchResult for a finished search from start_state that returned (node, generated, expanded)
+    """
+    if node is None:
+        return BatchResult(index, 'unsolvable', None, None, generated, expanded, seconds, None)
+    moves = search.move_string(node)
+    solution = SolveResult(moves, len(moves), generated, expanded, seconds, start_state)
+    return BatchResult(index, 'solved', solution, solution.depth, generated, expanded, seconds, None)
+
+
+def solve_many(levels, heuristic, workers=None, max_expanded=None, time_limit=None, memory_limit=None,
+               shared_tables=False, cache=None):
+    """
+    :param levels: an iterable of levels (lists of lists or numpy arrays)
+    :param heuristic: a module-level heuristic function (it is pickled by name)
+    :param workers: number of worker processes (default: os.cpu_count())
+    :param max_expanded: per-level expansion budget
+    :param time_limit: per-level time budget in seconds
+    :param memory_limit: per-worker address-space cap in bytes
+    :param shared_tables: build the UID heuristic's level tables once here and share them with the
+                          workers through shared memory (see artifacts)
+    :param cache: a solcache.SolutionCache to look levels up in first and to store new solutions in (as
+                  optimal, so the heuristic must be admissible)
+    :return: a generator of BatchResult, in completion order; index is the level's position in levels
+    """
+    levels = list(levels)
+    workers = workers or os.cpu_count() or 1
+    initializer, initargs = (None, ()) if memory_limit is None else (limit_memory, (memory_limit,))
+
+    def new_pool(n):
+        return ProcessPoolExecutor(max_workers=n, initializer=initializer, initargs=initargs)
+
+    queue = deque()
+    for index, level in enumerate(levels):
+        start = time.perf_counter()
+        hit = cache.get(level) if cache is not None else None
+        if hit:
+            yield BatchResult(index, 'cached', hit, hit.depth, hit.generated, hit.expanded,
+                              time.perf_counter() - start, None)
+        else:
+            queue.append(index)
+    if not queue:
+        return
+    registry = artifacts.Registry() if shared_tables else None
+    keys = [None] * len(levels)
+    if registry is not None:
+        for index in queue:
+            keys[index] = registry.publish(levels[index])
+    suspects = deque()
+    running = {}
+    pool = None
+    try:
+        while queue or suspects or running:
+            while len(running) < workers and (queue or suspects):
+                if suspects:
+                    index = suspects.popleft()
+                    executor = new_pool(1)
+                else:
+                    index = queue.popleft()
+                    if pool is None:
+                        pool = new_pool(workers)
+                    executor = None
+                future = (executor or pool).submit(
+                    solve_one, index, levels[index], heuristic, max_expanded, time_limit, keys[index])
+                running[future] = (index, executor, pool if executor is None else None)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, executor, shared = running.pop(future)
+                if executor is not None:
+                    executor.shutdown(wait=False)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    if executor is None:
+                        # Some level in the shared pool took its worker down;
+                        # rerun everything that was in flight in isolation.
+                        # A late failure from a pool that was already replaced
+                        # must not shut down the healthy one.
+                        if shared is pool and pool is not None:
+                            pool.shutdown(wait=False, cancel_futures=True)
+                            pool = None
+                        suspects.append(index)
+                        continue
+                    result = BatchResult(index, 'crashed', None, None, None, None, None,
+                                         'worker process died')
+                except Exception as e:
+                    result = BatchResult(index, 'error', None, None, None, None, None, repr(e))
+                if cache is not None and result.status == 'solved':
+                    cache.put(levels[index], result.solution)
+                yield result
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        for _, executor, _ in running.values():
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        if registry is not None:
+            registry.close()
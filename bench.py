@@ -0,0 +1,242 @@
+"""Benchmark the builtin levels across heuristics and engines.
+
+Every (level, heuristic, engine) case runs in its own process with a
+wall-clock timeout. The runner records the status, wall time, nodes
+generated and expanded, solution depth and the peak RSS of that process.
+Processes are started with spawn rather than fork, and the peak is read
+from VmHWM in /proc/self/status where that exists: a forked child counts
+the pages it shares with the runner, and ru_maxrss survives exec, so
+either would report the runner's memory when it is larger than the
+search's.
+Results are written as JSON, and they can be compared with a stored
+baseline run. With tolerances of zero for nodes and depth, any change in
+the search itself counts as a regression. Wall time and memory get a
+relative tolerance plus a small absolute slack for noise.
+
+The node counts and depths documented with the levels in builtin.xsb
+(e.g. [1738,50] for s7: nodes expanded by A* with h0, optimal depth) are
+kept with each result as reference points. A solution from one of the
+optimal engines that differs from the documented depth is always
+reported as a regression.
+
+    python bench.py --heuristics h1,hUID --output bench.json
+    python bench.py --heuristics h1,hUID --baseline bench.json
+"""
+
+import json
+import multiprocessing
+import platform
+import re
+import resource
+import sys
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+
+import external
+import levels
+import search
+from hw3 import goal_test, next_states, h0, h1, h905751487
+
+VERSION = 1
+
+HEURISTICS = {'h0': h0, 'h1': h1, 'hUID': h905751487}
+
+# Engines that return optimal solutions for admissible heuristics.
+ENGINES = {
+    'astar': search.a_star_search,
+    'ida': search.ida_star_search,
+    'pea': search.partial_expansion_a_star_search,
+    'external': external.external_a_star_search,
+}
+
+TIMEOUT = 60.0
+TOLERANCES = {'nodes': 0.0, 'seconds': 0.5, 'peak_rss': 0.25}
+# Absolute slack added to the relative tolerance (seconds, bytes).
+SLACK = {'seconds': 0.05, 'peak_rss': 8 << 20}
+
+REFERENCE = re.compile(r'\[(\?\?|\d+),(\d+)\]')
+
+
+def references():
+    """
+    :return: dict of level name -> (documented nodes expanded with h0 or None, documented optimal depth)
+    """
+    result = {}
+    for name, level in levels.builtin().items():
+        for comment in level.comments:
+            match = REFERENCE.search(comment)
+            if match:
+                nodes, depth = match.groups()
+                result[name] = (None if nodes == '??' else int(nodes), int(depth))
+    return result
+
+
+def peak_rss():
+    """
+    :return: the peak resident set size of this process in bytes
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere.
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def measure(level, heuristic, engine, conn):
+    """
+    Child process body: solve one case and send its measurements through conn.
+    """
+    start = time.perf_counter()
+    try:
+        goal_node, generated, expanded = ENGINES[engine](
+            np.array(levels.builtin()[level].rows), goal_test, next_states, HEURISTICS[heuristic])
+    except MemoryError:
+        conn.send({'status': 'memory'})
+        return
+    seconds = time.perf_counter() - start
+    depth = None
+    if goal_node is not None:
+        depth = 0
+        while goal_node.parent is not None:
+            goal_node = goal_node.parent
+            depth += 1
+    conn.send({
+        'status': 'solved' if depth is not None else 'unsolvable',
+        'seconds': seconds,
+        'generated': generated,
+        'expanded': expanded,
+        'depth': depth,
+        'peak_rss': peak_rss(),
+    })
+
+
+def run_case(level, heuristic, engine, timeout=TIMEOUT):
+    """
+    :return: the result dict of one case (see run)
+    """
+    reference_nodes, optimal = references().get(level, (None, None))
+    result = {'level': level, 'heuristic': heuristic, 'engine': engine, 'status': None, 'seconds': None,
+              'generated': None, 'expanded': None, 'depth': None, 'peak_rss': None,
+              'optimal_depth': optimal, 'reference_expanded': reference_nodes}
+    ctx = multiprocessing.get_context('spawn')
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=measure, args=(level, heuristic, engine, sender), daemon=True)
+    start = time.perf_counter()
+    process.start()
+    sender.close()
+    if receiver.poll(timeout):
+        try:
+            result.update(receiver.recv())
+        except EOFError:
+            result['status'] = 'crashed'
+    else:
+        result['status'] = 'timeout'
+        result['seconds'] = time.perf_counter() - start
+    process.kill()
+    process.join()
+    return result
+
+
+def run(level_names, heuristics, engines, timeout=TIMEOUT, report=None):
+    """
+    :param report: called with each result dict as soon as it is known
+    :return: the benchmark document: {'version', 'python', 'machine', 'results': [result dict, ...]}
+    """
+    results = []
+    for level in level_names:
+        for heuristic in heuristics:
+            for engine in engines:
+                result = run_case(level, heuristic, engine, timeout)
+                results.append(result)
+                if report is not None:
+                    report(result)
+    return {'version': VERSION, 'python': platform.python_version(), 'machine': platform.machine(),
+            'results': results}
+
+
+def compare(current, baseline, tolerances=None):
+    """
+    :param current: a benchmark document
+    :param baseline: a benchmark document to compare with; cases missing from either are skipped
+    :param tolerances: relative tolerances by measure ('nodes', 'seconds', 'peak_rss'), default TOLERANCES
+    :return: list of regression messages (empty if there is none)
+    """
+    tolerances = dict(TOLERANCES, **(tolerances or {}))
+    before = {(r['level'], r['heuristic'], r['engine']): r for r in baseline['results']}
+    regressions = []
+    for r in current['results']:
+        case = '{level} {heuristic} {engine}'.format(**r)
+        if r['status'] == 'solved' and r['optimal_depth'] is not None and r['depth'] != r['optimal_depth']:
+            regressions.append('{}: depth {} but the optimal depth is {}'.format(case, r['depth'],
+                                                                               r['optimal_depth']))
+        old = before.get((r['level'], r['heuristic'], r['engine']))
+        if old is None:
+            continue
+        if old['status'] == 'solved' and r['status'] != 'solved':
+            regressions.append('{}: {} (was solved)'.format(case, r['status']))
+            continue
+        if old['status'] != 'solved' or r['status'] != 'solved':
+            continue
+        if r['depth'] != old['depth']:
+            regressions.append('{}: depth {} (was {})'.format(case, r['depth'], old['depth']))
+        checks = [('generated', 'nodes'), ('expanded', 'nodes'), ('seconds', 'seconds'), ('peak_rss', 'peak_rss')]
+        for field, kind in checks:
+            limit = old[field] * (1 + tolerances[kind]) + SLACK.get(kind, 0)
+            if r[field] > limit:
+                regressions.append('{}: {} {} (was {}, limit {:.6g})'.format(case, field, r[field], old[field],
+                                                                              limit))
+    return regressions
+
+
+def print_result(r):
+    print('{level:<5} {heuristic:<5} {engine:<8} {status:<10} {:>9} {:>9} {:>6} {:>9} {:>8} {:>7}'.format(
+        '' if r['expanded'] is None else r['expanded'],
+        '' if r['reference_expanded'] is None else r['reference_expanded'],
+        '' if r['depth'] is None else r['depth'],
+        '' if r['seconds'] is None else '{:.3f}'.format(r['seconds']),
+        '' if r['peak_rss'] is None else r['peak_rss'] >> 20,
+        '' if r['optimal_depth'] is None else r['optimal_depth'], **r), flush=True)
+
+
+def main(argv=None):
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--levels', default=','.join(levels.builtin()),
+                        help='comma-separated level names (default: all builtin levels)')
+    parser.add_argument('--heuristics', default=','.join(HEURISTICS),
+                        help='comma-separated names from {}'.format(', '.join(HEURISTICS)))
+    parser.add_argument('--engines', default='astar',
+                        help='comma-separated names from {} (default: astar)'.format(', '.join(ENGINES)))
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='seconds per case')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare with this JSON file and exit with 1 on regressions')
+    for kind, default in TOLERANCES.items():
+        parser.add_argument('--{}-tolerance'.format(kind.replace('_', '-')), type=float, default=default,
+                            dest=kind, help='relative tolerance for {} (default: {})'.format(kind, default))
+    args = parser.parse_args(argv)
+
+    print('{:<5} {:<5} {:<8} {:<10} {:>9} {:>9} {:>6} {:>9} {:>8} {:>7}'.format(
+        'level', 'h', 'engine', 'status', 'expanded', 'reference', 'depth', 'seconds', 'rss MiB', 'optimal'))
+    document = run(args.levels.split(','), args.heuristics.split(','), args.engines.split(','),
+                   args.timeout, print_result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(document, baseline, {kind: getattr(args, kind) for kind in TOLERANCES})
+        for message in regressions:
+            print('REGRESSION', message)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Checkpoint and resume long A* searches.
+
+a_star_search() runs search.iter_a_star_search with a Checkpoint that
+writes a snapshot of the search every `every` expansions and/or every
+`interval` seconds. resume(path) restores the snapshot and continues with
+exactly the same open list, closed set and counters, so a resumed search
+expands the same nodes in the same order as one that was never stopped.
+
+A snapshot file is MAGIC, a version byte, and a pickled dict:
+
+* the search functions (goal_test, next_states, heuristic, state_key,
+  next_moves) and weight, pickled by reference, so they must be
+  module-level functions;
+* every node on the open list and its ancestors as flat arrays: states
+  (uint8, one row per node), parent index (-1 for the root), cost,
+  evaluation and move, ordered so that parents come before children;
+* the open list as node indices in heap order, the closed set, and the
+  generated/expanded counters.
+
+Snapshots are written to a temporary file and moved into place with
+os.replace, so a crash while writing leaves the previous snapshot intact.
+"""
+
+import os
+import pickle
+import time
+
+import numpy as np
+
+import search
+
+MAGIC = b'SOKCKPT'
+VERSION = 1
+
+
+class Checkpoint:
+    def __init__(self, path, config, every=None, interval=None, node_expanded=0):
+        """
+        :param path: the snapshot file
+        :param config: the search functions and options stored with every snapshot (see save)
+        :param every: save after this many expansions since the last snapshot
+        :param interval: save when this many seconds have passed since the last snapshot
+        :param node_expanded: the expansion count the search starts from
+        """
+        self.path = path
+        self.config = config
+        self.every = every
+        self.interval = interval
+        self.last_expanded = node_expanded
+        self.last_time = time.monotonic()
+        self.saved = 0
+
+    def __call__(self, open_list, explored, node_generated, node_expanded):
+        if ((self.every is not None and node_expanded - self.last_expanded >= self.every) or
+                (self.interval is not None and time.monotonic() - self.last_time >= self.interval)):
+            save(self.path, self.config, open_list, explored, node_generated, node_expanded)
+            self.last_expanded = node_expanded
+            self.last_time = time.monotonic()
+            self.saved += 1
+
+
+def save(path, config, open_list, explored, node_generated, node_expanded):
+    """
+    Write a snapshot of a search atomically.
+
+    :param config: dict with goal_test, next_states, heuristic, state_key, next_moves, weight, every, interval
+    """
+    nodes = {}
+    for node in open_list:
+        while node is not None and id(node) not in nodes:
+            nodes[id(node)] = node
+            node = node.parent
+    # A child always costs one more than its parent, so sorting by cost puts parents first.
+    order = sorted(nodes.values(), key=lambda n: n.cost)
+    index = {id(node): i for i, node in enumerate(order)}
+    if order:
+        first = order[0].state1
+        states = np.stack([node.state1.astype(np.uint8) for node in order])
+    else:
+        # The frontier is empty once the search has run out of states to expand.
+        first = states = np.zeros((0, 0, 0), dtype=np.uint8)
+    snapshot = {
+        'config': config,
+        'shape': first.shape,
+        'dtype': first.dtype.str,
+        'states': states,
+        'parents': np.array([-1 if node.parent is None else index[id(node.parent)] for node in order],
+                            dtype=np.int64),
+        'costs': np.array([node.cost for node in order], dtype=np.int64),
+        'evaluations': np.array([node.evaluation for node in order]),
+        'moves': [node.move for node in order],
+        'open': np.array([index[id(node)] for node in open_list], dtype=np.int64),
+        'explored': explored,
+        'generated': node_generated,
+        'expanded': node_expanded,
+    }
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + bytes([VERSION]))
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load(path):
+    """
+    :return: (config, open list, closed set, nodes generated, nodes expanded) of the snapshot at path
+    """
+    with open(path, 'rb') as f:
+        header = f.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError('not a search checkpoint: {}'.format(path))
+        if header[len(MAGIC)] != VERSION:
+            raise ValueError('unsupported checkpoint version {}'.format(header[len(MAGIC)]))
+        snapshot = pickle.load(f)
+    config = snapshot['config']
+    state_key = config['state_key'] or search.default_key
+    dtype = np.dtype(snapshot['dtype'])
+    nodes = []
+    for state, parent, cost, evaluation, move in zip(
+            snapshot['states'], snapshot['parents'].tolist(), snapshot['costs'].tolist(),
+            snapshot['evaluations'].tolist(), snapshot['moves']):
+        state = state.astype(dtype)
+        nodes.append(search.SearchNode(state, None if parent < 0 else nodes[parent], cost, evaluation,
+                                       state_key(state), move))
+    open_list = [nodes[i] for i in snapshot['open'].tolist()]
+    return config, open_list, snapshot['explored'], snapshot['generated'], snapshot['expanded']
+
+
+def a_star_search(start_state, goal_test, next_states, heuristic, path, every=None, interval=None,
+                  state_key=None, max_expanded=None, time_limit=None, weight=1, next_moves=None):
+    """
+    search.a_star_search that writes a snapshot to path every `every` expansions and/or `interval`
+    seconds. The snapshot is left in place when the search ends.
+
+    :return: (goal node or None, nodes generated, nodes expanded)
+    """
+    config = {'goal_test': goal_test, 'next_states': next_states, 'heuristic': heuristic,
+              'state_key': state_key, 'next_moves': next_moves, 'weight': weight,
+              'every': every, 'interval': interval}
+    return search.run(search.iter_a_star_search(
+        start_state, goal_test, next_states, heuristic, state_key, max_expanded, time_limit, weight,
+        next_moves=next_moves, checkpoint=Checkpoint(path, config, every, interval)))
+
+
+def resume(path, max_expanded=None, time_limit=None):
+    """
+    Continue the search saved at path, checkpointing to the same file as before.
+
+    :param max_expanded: expansion budget, counted from the start of the original search
+    :param time_limit: time budget in seconds for this run
+    :return: (goal node or None, nodes generated, nodes expanded), as if the search had never stopped
+    """
+    config, open_list, explored, node_generated, node_expanded = load(path)
+    return search.run(search.iter_a_star_from(
+        open_list, explored, node_generated, node_expanded, config['goal_test'], config['next_states'],
+        config['heuristic'], config['state_key'] or search.default_key, max_expanded, time_limit,
+        config['weight'], next_moves=config['next_moves'],
+        checkpoint=Checkpoint(path, config, config['every'], config['interval'], node_expanded)))
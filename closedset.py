@@ -0,0 +1,113 @@
+"""A compact closed set for the search engines.
+
+ClosedSet maps state keys to g-values like the dict that the engines use
+by default, but it stores no key objects. Each key is reduced to a 64-bit
+blake2b hash plus optional verification bytes (more bits of the same
+digest). These live in preallocated NumPy arrays addressed by open
+addressing with linear probing, and the arrays double in size when the
+load factor is exceeded. An entry then costs the slot width (8 bytes of
+hash, 4 of g, and the verification bytes) divided by the load factor,
+instead of the hundreds of bytes of a bytes key in a dict.
+
+Two different states are confused only if their hashes and verification
+bytes all collide. With n states this has probability about
+n**2 / 2**(65 + 8 * verify_bytes), so a few hundred million states are
+safe without verification bytes.
+"""
+
+import hashlib
+
+import numpy as np
+
+MAX_LOAD = 0.7
+
+
+class ClosedSet:
+    def __init__(self, capacity=1024, verify_bytes=0, max_load=MAX_LOAD):
+        """
+        :param capacity: initial number of slots (rounded up to a power of two)
+        :param verify_bytes: extra digest bytes stored per entry and compared on lookup
+        :param max_load: fraction of slots in use that triggers doubling
+        """
+        self.verify_bytes = verify_bytes
+        self.max_load = max_load
+        self.count = 0
+        self.allocate(1 << max(3, (capacity - 1).bit_length()))
+
+    def allocate(self, slots):
+        self.mask = slots - 1
+        self.limit = int(slots * self.max_load)
+        self.hashes = np.zeros(slots, dtype=np.uint64)
+        self.costs = np.zeros(slots, dtype=np.int32)
+        self.verify = np.zeros((slots, self.verify_bytes), dtype=np.uint8)
+
+    def digest(self, key):
+        """
+        :return: (hash, verification bytes) of key; hash 0 marks an empty slot, so it is never returned
+        """
+        d = hashlib.blake2b(key, digest_size=8 + self.verify_bytes).digest()
+        return int.from_bytes(d[:8], 'little') or 1, d[8:]
+
+    def find(self, h, check):
+        """
+        :return: the slot holding (h, check), or the empty slot where it would go
+        """
+        hashes = self.hashes
+        i = h & self.mask
+        while True:
+            found = int(hashes[i])
+            if found == 0 or (found == h and (not check or self.verify[i].tobytes() == check)):
+                return i
+            i = (i + 1) & self.mask
+
+    def get(self, key, default=None):
+        h, check = self.digest(key)
+        i = self.find(h, check)
+        return default if self.hashes[i] == 0 else int(self.costs[i])
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        cost = self.get(key)
+        if cost is None:
+            raise KeyError(key)
+        return cost
+
+    def __setitem__(self, key, cost):
+        h, check = self.digest(key)
+        i = self.find(h, check)
+        if self.hashes[i] == 0:
+            if self.count >= self.limit:
+                self.grow()
+                i = self.find(h, check)
+            self.hashes[i] = h
+            if check:
+                self.verify[i] = np.frombuffer(check, dtype=np.uint8)
+            self.count += 1
+        self.costs[i] = cost
+
+    def grow(self):
+        used = np.nonzero(self.hashes)[0]
+        hashes, costs, verify = self.hashes[used], self.costs[used], self.verify[used]
+        self.allocate(2 * (self.mask + 1))
+        for h, cost, check in zip(hashes.tolist(), costs.tolist(), verify):
+            i = h & self.mask
+            while self.hashes[i] != 0:
+                i = (i + 1) & self.mask
+            self.hashes[i] = h
+            self.costs[i] = cost
+            self.verify[i] = check
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return self.hashes.nbytes + self.costs.nbytes + self.verify.nbytes
+
+    def bytes_per_entry(self):
+        """
+        :return: the memory of the arrays divided by the number of entries
+        """
+        return self.nbytes / max(1, self.count)
@@ -0,0 +1,144 @@
+"""Binary level corpus with O(1) random access.
+
+File layout (all integers little-endian):
+
+    header   b'SOKC', version (u16), reserved (u16), count (u64), index offset (u64)
+    records  one per level: rows (u16), cols (u16), title length (u16), title (UTF-8),
+             then rows * cols cells of 3 bits each, packed MSB first into bytes
+    index    count u64 offsets of the records
+
+Corpus maps the file with mmap and decodes a record only when it is
+indexed, so opening a corpus costs the same whatever its size and corpus[i]
+never touches the other levels.
+"""
+
+import mmap
+import struct
+
+import numpy as np
+
+import levels
+
+MAGIC = b'SOKC'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQ')
+RECORD = struct.Struct('<HHH')
+BITS = np.array([4, 2, 1], dtype=np.uint8)
+
+
+def pack_states(states):
+    """
+    :param states: (n, cells) array of hw3 codes
+    :return: (n, ceil(3 * cells / 8)) uint8 array, each row the packed cells of one state
+    """
+    states = np.asarray(states, dtype=np.uint8)
+    if states.size and states.max() > 7:
+        raise ValueError('cell value does not fit in 3 bits')
+    bits = (states[:, :, None] >> np.array([2, 1, 0], dtype=np.uint8)) & 1
+    return np.packbits(bits.reshape(len(states), -1), axis=1)
+
+
+def unpack_states(packed, cells):
+    """
+    :return: the (n, cells) uint8 array that pack_states packed into packed
+    """
+    bits = np.unpackbits(np.asarray(packed, dtype=np.uint8), axis=1, count=3 * cells)
+    return bits.reshape(len(bits), cells, 3) @ BITS
+
+
+def pack_cells(state):
+    return pack_states(np.asarray(state).reshape(1, -1))[0].tobytes()
+
+
+def unpack_cells(buf, rows, cols):
+    packed = np.frombuffer(buf, dtype=np.uint8).reshape(1, -1)
+    return unpack_states(packed, rows * cols).astype(np.int64).reshape(rows, cols)
+
+
+def write_corpus(path, items):
+    """
+    :param path: file to create
+    :param items: iterable of levels.Level or 2D arrays (lists of lists or numpy arrays); consumed lazily
+    :return: the number of levels written
+    """
+    offsets = []
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        for item in items:
+            if isinstance(item, levels.Level):
+                title, state = item.title or '', item.rows
+            else:
+                title, state = '', item
+            state = np.asarray(state)
+            encoded = title.encode()
+            offsets.append(f.tell())
+            f.write(RECORD.pack(state.shape[0], state.shape[1], len(encoded)))
+            f.write(encoded)
+            f.write(pack_cells(state))
+        index_offset = f.tell()
+        f.write(np.array(offsets, dtype='<u8').tobytes())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(offsets), index_offset))
+    return len(offsets)
+
+
+def convert_xsb(source, path):
+    """
+    Convert an XSB collection (see levels.iter_xsb) to a corpus file without loading it whole.
+
+    :return: the number of levels written
+    """
+    return write_corpus(path, levels.iter_xsb(source))
+
+
+class Corpus:
+    def __init__(self, path):
+        """
+        :param path: a file written by write_corpus
+        """
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, index_offset = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError('not a level corpus: {}'.format(path))
+        if version != VERSION:
+            raise ValueError('unsupported corpus version {}'.format(version))
+        self.count = count
+        self.offsets = np.frombuffer(self.map, dtype='<u8', count=count, offset=index_offset)
+
+    def __len__(self):
+        return self.count
+
+    def record(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError('corpus index out of range')
+        offset = int(self.offsets[i])
+        rows, cols, title_length = RECORD.unpack_from(self.map, offset)
+        return offset + RECORD.size, rows, cols, title_length
+
+    def __getitem__(self, i):
+        """
+        :return: level i as a numpy array of hw3 codes
+        """
+        start, rows, cols, title_length = self.record(i)
+        start += title_length
+        size = (3 * rows * cols + 7) // 8
+        return unpack_cells(self.map[start:start + size], rows, cols)
+
+    def title(self, i):
+        start, _, _, title_length = self.record(i)
+        return self.map[start:start + title_length].decode() or None
+
+    def close(self):
+        # The index is a view into the map; drop it before unmapping.
+        self.offsets = None
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,209 @@
+"""External-memory A* with delayed duplicate detection.
+
+The search space is split into buckets by (g, h), as in External A*
+(Edelkamp, Jabbar and Schroedl). A bucket holds records of two packed
+state keys (corpus.pack_states, 3 bits per cell): the state and its
+parent. New records are buffered in memory; when the buffers exceed the
+memory budget they are sorted, deduplicated and written to disk as runs.
+
+Buckets are expanded in order of f = g + h, then g. Expanding a bucket
+first merges its runs and buffers with one sort-unique pass. Then every
+state that already occurs in a closed run with the same h and a g no
+larger than the bucket's is dropped. h depends only on the state, so a
+duplicate always has the same h, and these runs are the only places
+where it can be found. The surviving records become the bucket's closed
+run, and their successors go to buckets (g + 1, h'). The closed runs
+double as parent records: the solution is traced back through the runs
+of g - 1, g - 2, ... down to the start state.
+
+Only the buffers, the bucket being expanded and one closed run at a time
+are held in memory, so the closed set and the frontier can be much
+larger than RAM.
+"""
+
+import os
+import shutil
+import tempfile
+from collections import defaultdict
+
+import numpy as np
+
+import corpus
+import search
+
+MEMORY_LIMIT = 64 << 20
+CHUNK = 4096
+
+
+class Runs:
+    def __init__(self, shape, dtype, directory=None):
+        """
+        The on-disk part of an external search: open runs per bucket and closed runs per h.
+
+        :param shape: the shape of the states
+        :param dtype: the dtype of the states
+        :param directory: where to create the run files (a fresh temporary directory in it)
+        """
+        self.shape = shape
+        self.dtype = dtype
+        self.cells = int(np.prod(shape))
+        width = (3 * self.cells + 7) // 8
+        self.key_type = np.dtype((np.void, width))
+        self.record = np.dtype([('key', self.key_type), ('parent', self.key_type)])
+        self.directory = tempfile.mkdtemp(prefix='sokoban-external-', dir=directory)
+        self.open = defaultdict(list)
+        self.closed = defaultdict(list)
+        self.depths = defaultdict(list)
+        self.written = 0
+
+    def pack(self, states):
+        """
+        :param states: a list of states
+        :return: their packed keys
+        """
+        flat = np.stack(states).reshape(len(states), self.cells)
+        return np.ascontiguousarray(corpus.pack_states(flat)).view(self.key_type).ravel()
+
+    def unpack(self, keys):
+        """
+        :return: the states of the packed keys, as an (n,) + shape array of the original dtype
+        """
+        packed = np.ascontiguousarray(keys).view(np.uint8).reshape(len(keys), -1)
+        return corpus.unpack_states(packed, self.cells).astype(self.dtype).reshape((len(keys),) + self.shape)
+
+    def write(self, records):
+        path = os.path.join(self.directory, '{}.npy'.format(self.written))
+        self.written += 1
+        np.save(path, records)
+        return path
+
+    def spill(self, bucket, records):
+        self.open[bucket].append(self.write(unique(records)))
+
+    def take(self, bucket, buffered):
+        """
+        Merge the open runs of bucket with its buffered records and delete the runs.
+
+        :return: the records, sorted by key, without duplicate keys
+        """
+        parts = list(buffered)
+        for path in self.open.pop(bucket, ()):
+            parts.append(np.load(path))
+            os.remove(path)
+        return unique(np.concatenate(parts))
+
+    def drop_closed(self, g, h, records):
+        """
+        :return: the records whose key is in no closed run (g2, h) with g2 <= g
+        """
+        keep = np.ones(len(records), dtype=bool)
+        for g2, path in self.closed[h]:
+            if g2 > g:
+                continue
+            run = np.load(path, mmap_mode='r')['key']
+            if len(run):
+                pos = np.minimum(np.searchsorted(run, records['key']), len(run) - 1)
+                keep &= run[pos] != records['key']
+        return records[keep]
+
+    def close(self, g, h, records):
+        path = self.write(records)
+        self.closed[h].append((g, path))
+        self.depths[g].append(path)
+
+    def parent(self, g, key):
+        """
+        :return: the parent key recorded for key in the closed runs of depth g
+        """
+        for path in self.depths[g]:
+            run = np.load(path, mmap_mode='r')
+            pos = np.searchsorted(run['key'], key)
+            if pos < len(run) and run['key'][pos] == key:
+                return run['parent'][pos]
+        raise LookupError('no closed record at depth {}'.format(g))
+
+    def remove(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def unique(records):
+    keys, first = np.unique(records['key'], return_index=True)
+    return records[first]
+
+
+def external_a_star_search(start_state, goal_test, next_states, heuristic, memory_limit=MEMORY_LIMIT,
+                           directory=None, chunk=CHUNK):
+    """
+    A* whose open and closed sets live in sorted runs on disk (see the module docstring).
+    The solution is optimal when the heuristic is admissible. States must use codes 0-7.
+
+    :param memory_limit: bytes of buffered records kept in memory before they are spilled to disk
+    :param directory: where to put the temporary run files (default: the system temporary directory)
+    :param chunk: number of states unpacked and expanded at a time
+    :return: (goal node or None, nodes generated, nodes expanded); the path is a chain of search.SearchNode
+    """
+    start_state = np.asarray(start_state)
+    runs = Runs(start_state.shape, start_state.dtype, directory)
+    limit = max(1, memory_limit // runs.record.itemsize)
+    buffers = defaultdict(list)
+    buffered = 0
+
+    def add(bucket, records):
+        nonlocal buffered
+        buffers[bucket].append(records)
+        buffered += len(records)
+        if buffered > limit:
+            for spilled, parts in buffers.items():
+                runs.spill(spilled, np.concatenate(parts))
+            buffers.clear()
+            buffered = 0
+
+    root = np.zeros(1, dtype=runs.record)
+    root['key'] = runs.pack([start_state])
+    add((0, heuristic(start_state)), root)
+    node_generated = 1
+    node_expanded = 0
+
+    try:
+        while buffers or runs.open:
+            g, h = min(set(buffers) | set(runs.open), key=lambda bucket: (bucket[0] + bucket[1], bucket[0]))
+            parts = buffers.pop((g, h), [])
+            buffered -= sum(len(part) for part in parts)
+            records = runs.drop_closed(g, h, runs.take((g, h), parts))
+            if not len(records):
+                continue
+            runs.close(g, h, records)
+            for begin in range(0, len(records), chunk):
+                keys = records['key'][begin:begin + chunk]
+                successors = defaultdict(list)
+                parents = defaultdict(list)
+                for key, s in zip(keys, runs.unpack(keys)):
+                    if goal_test(s):
+                        return path_to(runs, g, key, heuristic), node_generated, node_expanded
+                    node_expanded += 1
+                    for s1 in next_states(s):
+                        h1 = heuristic(s1)
+                        successors[h1].append(s1)
+                        parents[h1].append(key)
+                        node_generated += 1
+                for h1, states in successors.items():
+                    new = np.empty(len(states), dtype=runs.record)
+                    new['key'] = runs.pack(states)
+                    new['parent'] = parents[h1]
+                    add((g + 1, h1), new)
+        return None, node_generated, node_expanded
+    finally:
+        runs.remove()
+
+
+def path_to(runs, g, key, heuristic):
+    """
+    :return: the SearchNode chain from the start state to the state of key, found at depth g
+    """
+    keys = [key]
+    for depth in range(g, 0, -1):
+        keys.append(runs.parent(depth, keys[-1]))
+    node = None
+    for cost, s in enumerate(runs.unpack(np.array(keys[::-1], dtype=runs.key_type))):
+        node = search.SearchNode(s, node, cost, cost + heuristic(s), search.default_key(s))
+    return node
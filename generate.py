@@ -0,0 +1,172 @@
+"""Random levels that are solvable by construction.
+
+generate() draws a walled board of the given size with random interior
+walls, keeps its largest connected floor area, and puts the boxes on
+random goals with the keeper somewhere else. This is a solved position.
+It then plays the game backwards: the keeper walks to a random spot next
+to a box and pulls it one square, `pulls` times. Every pull reverses a
+legal push and every walk can be walked back, so the resulting level can
+be solved by undoing the pulls. Difficulty is controlled by the board
+size, wall density, box count and number of pulls.
+
+The output is a list of lists of hw3 codes, like the builtin levels. It
+depends only on the arguments and the seed.
+
+    python generate.py 10 12 --boxes 3 --count 5 --seed 1 > family.xsb
+"""
+
+import random
+import sys
+from argparse import ArgumentParser
+
+import levels
+from hw3 import blank, wall, box, keeper, star, boxstar, keeperstar
+
+ATTEMPTS = 100
+
+
+def floor_components(floor, width):
+    """
+    :param floor: set of open cell indices
+    :return: list of the connected components of floor (sets), largest first
+    """
+    components = []
+    unseen = set(floor)
+    while unseen:
+        start = unseen.pop()
+        component = {start}
+        stack = [start]
+        while stack:
+            p = stack.pop()
+            for q in (p - width, p + width, p - 1, p + 1):
+                if q in unseen:
+                    unseen.remove(q)
+                    component.add(q)
+                    stack.append(q)
+        components.append(component)
+    components.sort(key=len, reverse=True)
+    return components
+
+
+def reachable(floor, width, boxes, start):
+    """
+    :return: the set of cells the keeper can walk to from start without moving a box
+    """
+    seen = {start}
+    stack = [start]
+    while stack:
+        p = stack.pop()
+        for q in (p - width, p + width, p - 1, p + 1):
+            if q in floor and q not in boxes and q not in seen:
+                seen.add(q)
+                stack.append(q)
+    return seen
+
+
+def pull_moves(floor, width, boxes, region):
+    """
+    :return: sorted list of (keeper cell, direction): the keeper stands next to a box in direction d
+             and can step back to keeper - d, pulling the box onto its own cell
+    """
+    moves = []
+    for p in sorted(region):
+        for d in (-width, width, -1, 1):
+            if p + d in boxes and p - d in floor and p - d not in boxes:
+                moves.append((p, d))
+    return moves
+
+
+def generate(rows, cols, wall_density=0.15, boxes=2, pulls=None, seed=0):
+    """
+    :param rows: board height, including the outer walls
+    :param cols: board width, including the outer walls
+    :param wall_density: probability of a wall on each interior cell
+    :param boxes: number of boxes (and goals)
+    :param pulls: number of reverse pulls (default: 8 per box)
+    :param seed: any value accepted by random.Random
+    :return: the level as a list of lists of hw3 codes
+    :raises ValueError: if boxes or pulls is less than 1, or no board of these parameters could be built in
+                        ATTEMPTS tries
+    """
+    if boxes < 1:
+        raise ValueError('boxes must be at least 1, got {}'.format(boxes))
+    if pulls is None:
+        pulls = 8 * boxes
+    if pulls < 1:
+        raise ValueError('pulls must be at least 1, got {}'.format(pulls))
+    rng = random.Random(seed)
+    cramped = stuck = 0
+    for _ in range(ATTEMPTS):
+        interior = [r * cols + c for r in range(1, rows - 1) for c in range(1, cols - 1)]
+        candidates = {p for p in interior if rng.random() >= wall_density}
+        components = floor_components(candidates, cols)
+        if not components or len(components[0]) < 2 * boxes + 2:
+            cramped += 1
+            continue
+        floor = components[0]
+        cells = sorted(floor)
+        goals = set(rng.sample(cells, boxes))
+        box_cells = set(goals)
+        keeper_cell = rng.choice([p for p in cells if p not in goals])
+        for _ in range(pulls):
+            region = reachable(floor, cols, box_cells, keeper_cell)
+            moves = pull_moves(floor, cols, box_cells, region)
+            if not moves:
+                break
+            p, d = rng.choice(moves)
+            box_cells.remove(p + d)
+            box_cells.add(p)
+            keeper_cell = p - d
+        if box_cells == goals:
+            stuck += 1
+            continue
+        keeper_cell = rng.choice(sorted(reachable(floor, cols, box_cells, keeper_cell)))
+        return render_level(rows, cols, floor, goals, box_cells, keeper_cell)
+    raise ValueError('could not build a {}x{} level with {} boxes in {} attempts: {} had too little floor, in {} '
+                     'the pulls left every box on its goal'.format(rows, cols, boxes, ATTEMPTS, cramped, stuck))
+
+
+def render_level(rows, cols, floor, goals, box_cells, keeper_cell):
+    level = []
+    for r in range(rows):
+        row = []
+        for c in range(cols):
+            p = r * cols + c
+            if p not in floor:
+                row.append(wall)
+            elif p in box_cells:
+                row.append(boxstar if p in goals else box)
+            elif p == keeper_cell:
+                row.append(keeperstar if p in goals else keeper)
+            else:
+                row.append(star if p in goals else blank)
+        level.append(row)
+    return level
+
+
+def family(count, rows, cols, wall_density=0.15, boxes=2, pulls=None, seed=0):
+    """
+    :return: a generator of count levels; level i uses the seed '<seed>:<i>'
+    """
+    for i in range(count):
+        yield generate(rows, cols, wall_density, boxes, pulls, '{}:{}'.format(seed, i))
+
+
+def main(argv=None):
+    parser = ArgumentParser(description='Write random solvable levels as XSB to stdout.')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('cols', type=int)
+    parser.add_argument('--density', type=float, default=0.15, help='interior wall density')
+    parser.add_argument('--boxes', type=int, default=2)
+    parser.add_argument('--pulls', type=int, help='reverse pulls (default: 8 per box)')
+    parser.add_argument('--count', type=int, default=1)
+    parser.add_argument('--seed', default='0')
+    args = parser.parse_args(argv)
+    for i, level in enumerate(family(args.count, args.rows, args.cols, args.density, args.boxes, args.pulls,
+                                     args.seed)):
+        sys.stdout.write(levels.format_xsb(level, 'gen-{}-{}'.format(args.seed, i)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
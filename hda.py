@@ -0,0 +1,261 @@
+"""Hash-distributed A* (HDA*) over worker processes.
+
+Every state is owned by one worker, chosen by a CRC-32 of its key. A
+worker keeps its own open list and closed set, expands the states it
+owns, and sends each successor to the successor's owner, batched per
+destination, over multiprocessing queues.
+
+Goal states are reported to the coordinator (the calling process), which
+keeps the best solution cost U and broadcasts it. Workers then drop every
+node with f >= U. Search ends when two consecutive probe waves find every
+worker idle with the same message counts and every state batch sent has
+been received (Mattern's four-counter method). At that point no open node
+anywhere has f < U and none is in transit, so with an admissible
+heuristic U is optimal. The path is then read back from the owners'
+closed sets, where each entry keeps the key of the parent it was reached
+from.
+
+The contract is the one astar.a_star_search and search.a_star_search use.
+goal_test, next_states and heuristic must be picklable (module-level
+functions) when the platform starts workers with spawn.
+
+A worker that raises reports the traceback to the coordinator, and the
+coordinator checks that every worker is still alive whenever it has
+waited RECEIVE_TIMEOUT seconds for a message; either way the search is
+stopped with a WorkerError instead of waiting forever.
+"""
+
+import heapq
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+import zlib
+from itertools import count
+
+import numpy as np
+
+import search
+
+BATCH_SIZE = 64
+POLL_EVERY = 32
+PROBE_INTERVAL = 0.005
+RECEIVE_TIMEOUT = 0.5
+
+
+class WorkerError(Exception):
+    pass
+
+
+def owner(key, workers):
+    return zlib.crc32(key) % workers
+
+
+def worker(index, workers, inboxes, results, *args):
+    try:
+        search_worker(index, workers, inboxes, results, *args)
+    except Exception:
+        results.put(('error', index, traceback.format_exc()))
+
+
+def search_worker(index, workers, inboxes, results, dtype, shape, goal_test, next_states, heuristic, batch_size):
+    inbox = inboxes[index]
+    open_list = []
+    closed = {}
+    outbox = [[] for _ in range(workers)]
+    tie = count()
+    incumbent = float('inf')
+    sent = received = 0
+    generated = expanded = 0
+
+    def state_of(key):
+        return np.frombuffer(key, dtype=dtype).reshape(shape)
+
+    def push(g, key, parent_key):
+        f = g + heuristic(state_of(key))
+        if f < incumbent:
+            heapq.heappush(open_list, (f, g, next(tie), key, parent_key))
+
+    def flush():
+        nonlocal sent
+        for dest, items in enumerate(outbox):
+            if items:
+                inboxes[dest].put(('states', items))
+                outbox[dest] = []
+                sent += 1
+
+    def handle(message):
+        nonlocal received, incumbent
+        kind = message[0]
+        if kind == 'states':
+            received += 1
+            for g, key, parent_key in message[1]:
+                push(g, key, parent_key)
+        elif kind == 'bound':
+            incumbent = min(incumbent, message[1])
+        elif kind == 'probe':
+            idle = not has_work()
+            if idle:
+                flush()
+            results.put(('count', message[1], index, sent, received, idle))
+        elif kind == 'parent':
+            results.put(('parent', message[1], closed[message[1]][1]))
+        elif kind == 'stop':
+            results.put(('stats', index, generated, expanded))
+            return False
+        return True
+
+    def has_work():
+        while open_list and open_list[0][0] >= incumbent:
+            heapq.heappop(open_list)
+        return bool(open_list)
+
+    steps = 0
+    while True:
+        if not has_work():
+            flush()
+            if not handle(inbox.get()):
+                return
+            continue
+        steps += 1
+        if steps % POLL_EVERY == 0:
+            try:
+                while True:
+                    if not handle(inbox.get_nowait()):
+                        return
+            except queue.Empty:
+                pass
+            if not has_work():
+                continue
+
+        f, g, _, key, parent_key = heapq.heappop(open_list)
+        old = closed.get(key)
+        if old is not None and old[0] <= g:
+            continue
+        closed[key] = (g, parent_key)
+        state = state_of(key)
+        if goal_test(state):
+            incumbent = g
+            results.put(('goal', g, key))
+            continue
+        expanded += 1
+        for s in next_states(state):
+            generated += 1
+            child = s.tobytes()
+            dest = owner(child, workers)
+            if dest == index:
+                push(g + 1, child, key)
+            else:
+                outbox[dest].append((g + 1, child, key))
+                if len(outbox[dest]) >= batch_size:
+                    inboxes[dest].put(('states', outbox[dest]))
+                    outbox[dest] = []
+                    sent += 1
+
+
+def hda_star_search(start_state, goal_test, next_states, heuristic, workers=None, batch_size=BATCH_SIZE):
+    """
+    :param start_state:
+    :param goal_test: a function, return true only when the input is the goal state
+    :param next_states: a function, return a list of all successor states
+    :param heuristic: an admissible heuristic function
+    :param workers: number of worker processes (default: os.cpu_count())
+    :param batch_size: successors buffered per destination before a batch is sent
+    :return: (goal node or None, nodes generated, nodes expanded), summed over the workers
+    :raises WorkerError: if a worker raises an exception or exits before the search is over
+    """
+    start_state = np.ascontiguousarray(start_state)
+    workers = workers or os.cpu_count() or 1
+    ctx = multiprocessing.get_context()
+    inboxes = [ctx.Queue() for _ in range(workers)]
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, daemon=True,
+                    args=(i, workers, inboxes, results, start_state.dtype, start_state.shape,
+                          goal_test, next_states, heuristic, batch_size))
+        for i in range(workers)
+    ]
+    for p in processes:
+        p.start()
+
+    stopping = False
+    try:
+        start_key = start_state.tobytes()
+        inboxes[owner(start_key, workers)].put(('states', [(0, start_key, None)]))
+        incumbent, goal_key = float('inf'), None
+        pending = []
+
+        def receive():
+            nonlocal incumbent, goal_key
+            while True:
+                try:
+                    message = results.get(timeout=RECEIVE_TIMEOUT)
+                    break
+                except queue.Empty:
+                    for i, p in enumerate(processes):
+                        if p.exitcode is not None and (p.exitcode != 0 or not stopping):
+                            raise WorkerError('worker {} exited with code {}'.format(i, p.exitcode))
+            if message[0] == 'error':
+                raise WorkerError('worker {} failed:\n{}'.format(message[1], message[2]))
+            if message[0] == 'goal' and message[1] < incumbent:
+                incumbent, goal_key = message[1], message[2]
+                for q in inboxes:
+                    q.put(('bound', incumbent))
+            elif message[0] != 'goal':
+                pending.append(message)
+
+        wave, last = 0, None
+        while True:
+            wave += 1
+            for q in inboxes:
+                q.put(('probe', wave))
+            replies = {}
+            while len(replies) < workers:
+                receive()
+                for message in pending:
+                    if message[0] == 'count' and message[1] == wave:
+                        replies[message[2]] = message[3:]
+                pending.clear()
+            idle = all(r[2] for r in replies.values())
+            snapshot = (sum(r[0] for r in replies.values()) + 1, sum(r[1] for r in replies.values()))
+            if idle and snapshot[0] == snapshot[1] and snapshot == last:
+                break
+            last = snapshot if idle else None
+            time.sleep(PROBE_INTERVAL)
+
+        path = []
+        key = goal_key
+        while key is not None:
+            path.append(key)
+            inboxes[owner(key, workers)].put(('parent', key))
+            while not pending:
+                receive()
+            key = pending.pop()[2]
+
+        stopping = True
+        for q in inboxes:
+            q.put(('stop',))
+        generated, expanded = 1, 0
+        for _ in range(workers):
+            while not pending:
+                receive()
+            _, _, g, e = pending.pop()
+            generated += g
+            expanded += e
+    finally:
+        if not stopping:
+            for q in inboxes:
+                q.put(('stop',))
+        for p in processes:
+            p.join(timeout=1)
+            if p.is_alive():
+                p.terminate()
+
+    if goal_key is None:
+        return None, generated, expanded
+    node = None
+    for depth, key in enumerate(reversed(path)):
+        s = np.frombuffer(key, dtype=start_state.dtype).reshape(start_state.shape).copy()
+        node = search.SearchNode(s, node, depth, depth, key)
+    return node, generated, expanded
@@ -0,0 +1,172 @@
+"""Per-phase timing of a search.
+
+profile_search() runs one search with every hot path wrapped in a
+perf_counter_ns accumulator and returns a Profile that splits the wall
+time into phases:
+
+    goal_test, next_states (and within it try_move and np.copy),
+    heuristic, state_key (closed-set key construction), queue (heap
+    push/pop), and engine: everything else in the search loop.
+
+try_move and np.copy are timed by temporarily replacing hw3.try_move,
+and hw3.np with a copy of numpy whose copy function is wrapped; the heap
+operations by replacing search.heappush and search.heappop. The search
+itself runs unchanged. Patching module globals means that other threads
+using hw3 or search at the same time are timed too (and slowed down).
+
+Each timed call costs a wrapper call and two clock reads. This overhead
+is calibrated before the search, subtracted from the enclosing phases
+and reported, so the breakdown stays within a few percent of an
+uninstrumented run.
+
+    python hotpath.py s7 hUID
+"""
+
+import sys
+import time
+import types
+from collections import defaultdict
+from heapq import heappush, heappop
+
+import numpy as np
+
+import hw3
+import search
+
+PHASES = ('goal_test', 'next_states', 'heuristic', 'state_key', 'queue')
+NESTED = {'next_states': ('try_move', 'np.copy')}
+CALIBRATION_CALLS = 20000
+
+
+class Profile:
+    def __init__(self):
+        self.ns = defaultdict(int)
+        self.calls = defaultdict(int)
+        self.wall_ns = 0
+        self.overhead_ns = 0.0
+        self.result = None
+
+    def timed(self, phase, f):
+        """
+        :return: f wrapped so that its time and calls are added to phase
+        """
+        ns = self.ns
+        calls = self.calls
+        clock = time.perf_counter_ns
+
+        def wrapper(*args):
+            start = clock()
+            result = f(*args)
+            ns[phase] += clock() - start
+            calls[phase] += 1
+            return result
+
+        return wrapper
+
+    def calibrate(self, n=CALIBRATION_CALLS):
+        """
+        Measure the cost of one timed call beyond the call itself.
+        """
+        def noop(*args):
+            return None
+
+        probe = Profile()
+        wrapped = probe.timed('noop', noop)
+        clock = time.perf_counter_ns
+        start = clock()
+        for _ in range(n):
+            noop(None)
+        bare = clock() - start
+        start = clock()
+        for _ in range(n):
+            wrapped(None)
+        self.overhead_ns = max(0.0, (clock() - start - bare) / n)
+
+    def phases(self):
+        """
+        :return: dict of phase -> (nanoseconds with the timing overhead of nested phases removed, calls);
+                 'engine' is the remaining time of the search loop
+        """
+        result = {}
+        for phase in PHASES:
+            inner = sum(self.calls[child] for child in NESTED.get(phase, ()))
+            result[phase] = (max(0.0, self.ns[phase] - inner * self.overhead_ns), self.calls[phase])
+            for child in NESTED.get(phase, ()):
+                result[child] = (self.ns[child], self.calls[child])
+        total_calls = sum(self.calls.values())
+        timed = sum(self.ns[phase] for phase in PHASES)
+        outer_calls = sum(self.calls[phase] for phase in PHASES)
+        result['engine'] = (max(0.0, self.wall_ns - timed - outer_calls * self.overhead_ns), None)
+        result['total'] = (max(0.0, self.wall_ns - total_calls * self.overhead_ns), None)
+        return result
+
+    def report(self):
+        """
+        :return: the breakdown as a text table (milliseconds, share of the total, nanoseconds per call)
+        """
+        phases = self.phases()
+        total = phases['total'][0] or 1
+        lines = ['{:<14} {:>10} {:>7} {:>10} {:>10}'.format('phase', 'ms', '%', 'calls', 'ns/call')]
+        order = []
+        for phase in PHASES:
+            order.append((phase, phase))
+            order.extend(('  ' + child, child) for child in NESTED.get(phase, ()))
+        order += [('engine', 'engine'), ('total', 'total')]
+        for label, phase in order:
+            ns, calls = phases[phase]
+            lines.append('{:<14} {:>10.2f} {:>6.1f}% {:>10} {:>10}'.format(
+                label, ns / 1e6, 100 * ns / total, '' if calls is None else calls,
+                '' if not calls else '{:.0f}'.format(ns / calls)))
+        lines.append('timing overhead {:.0f} ns per call, {:.2f} ms in total (removed above)'.format(
+            self.overhead_ns, self.overhead_ns * sum(self.calls.values()) / 1e6))
+        return '\n'.join(lines)
+
+
+def profile_search(start_state, goal_test, next_states, heuristic, engine=search.a_star_search, state_key=None):
+    """
+    Run engine(start_state, goal_test, next_states, heuristic, state_key=...) with every phase timed.
+
+    :param engine: a search function from search with a state_key parameter
+    :return: a Profile; its result is the engine's return value
+    """
+    profile = Profile()
+    profile.calibrate()
+    timed_np = types.ModuleType('numpy')
+    timed_np.__dict__.update(np.__dict__)
+    timed_np.copy = profile.timed('np.copy', np.copy)
+    saved = hw3.try_move, hw3.np, search.heappush, search.heappop
+    hw3.try_move = profile.timed('try_move', hw3.try_move)
+    hw3.np = timed_np
+    search.heappush = profile.timed('queue', heappush)
+    search.heappop = profile.timed('queue', heappop)
+    try:
+        start = time.perf_counter_ns()
+        profile.result = engine(start_state,
+                                profile.timed('goal_test', goal_test),
+                                profile.timed('next_states', next_states),
+                                profile.timed('heuristic', heuristic),
+                                state_key=profile.timed('state_key', state_key or search.default_key))
+        profile.wall_ns = time.perf_counter_ns() - start
+    finally:
+        hw3.try_move, hw3.np, search.heappush, search.heappop = saved
+    return profile
+
+
+def main(argv=None):
+    import bench
+    import levels
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print('usage: python hotpath.py LEVEL HEURISTIC  (e.g. s7 hUID)')
+        return 2
+    level, heuristic = argv
+    profile = profile_search(np.array(levels.builtin()[level].rows), hw3.goal_test, hw3.next_states,
+                             bench.HEURISTICS[heuristic])
+    _, generated, expanded = profile.result
+    print('{} {}: {} generated, {} expanded'.format(level, heuristic, generated, expanded))
+    print(profile.report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -26,39 +26,48 @@
 import astar
 # Load the numpy package and the state is represented as a numpy array during this homework.
 import numpy as np
+import sys
+import time
+from collections import OrderedDict, namedtuple
+
+import search
 
 
 # a_star perform the A* algorithm with the start_state (numpy array), goal_test (function), successors (function) and
-# heuristic (function). a_star prints the solution from start_state to goal_state (path), calculates the number of
-# generated nodes (node_generated) and expanded nodes (node_expanded), and the solution depth (len(path)-1). a_star
-# also provides the following functions for printing states and moves: prettyMoves(path): Translate the solution to a
-# list of moves printlists(path): Visualize the solution and Print a list of states
+# heuristic (function). a_star prints the number of generated nodes (node_generated) and expanded nodes
+# (node_expanded) and the solution depth, and returns the SolveResult from solve (None if there is no solution).
+# The solution is kept as a move string; result.states() rebuilds the list of states when it is needed, e.g. for
+# printlists(result.states()).
 def a_star(start_state, goal_test, successors, heuristic):
-    goal_node, node_generated, node_expanded = astar.a_star_search(start_state, goal_test, successors, heuristic)
-    if goal_node:
-        node = goal_node
-        path = [node.state1]
-        while node.parent:
-            node = node.parent
-            path.append(node.state1)
-        path.reverse()
-
-        # print('My path:{}'.format(path))
-        # print(prettyMoves(path))
-        # printlists(path)
-        print('Nodes Generated by A*: {}'.format(node_generated))
-        print('Nodes Expanded by A*: {}'.format(node_expanded))
-        print('Solution Depth: {}'.format(len(path) - 1))
+    result = solve(start_state, heuristic, goal_test, successors)
+    if result:
+        # print(result.moves)
+        # printlists(result.states())
+        print('Nodes Generated by A*: {}'.format(result.generated))
+        print('Nodes Expanded by A*: {}'.format(result.expanded))
+        print('Solution Depth: {}'.format(result.depth))
     else:
         print('no solution found')
+    return result
 
 
 # A shortcut function
 # Transform the input state to numpy array. For other functions, the state s is presented as a numpy array.
 # Goal-test and next-states stay the same throughout the assignment
 # You can just call sokoban(init-state, heuristic function) to test the result
-def sokoban(s, h):
-    return a_star(np.array(s), goal_test, next_states, h)
+# cache can be a solcache.SolutionCache: a level found there is returned at once without searching, and new
+# solutions are stored in it (as optimal, so h must be admissible).
+def sokoban(s, h, cache=None):
+    if cache is not None:
+        result = cache.get(s)
+        if result:
+            print('Solution found in cache')
+            print('Solution Depth: {}'.format(result.depth))
+            return result
+    result = a_star(np.array(s), goal_test, next_states, h)
+    if cache is not None and result:
+        cache.put(s, result)
+    return result
 
 
 # Define some global variables
@@ -324,14 +333,77 @@ def next_states(s):
     
     return cleaned_states_list
 
-test = np.array([
-    [1, 2, 3],
-    [0, 0, 2],
-    [0, 0, 1]
-]) 
+# Like next_states, but return (move, state) pairs in the same order (up, down, left, right).
+# The move is 'u', 'd', 'l' or 'r', in upper case when the keeper pushes a box.
+moveSteps = (('u', -1, 0), ('d', 1, 0), ('l', 0, -1), ('r', 0, 1))
+
+
+def next_moves(s):
+    r, c = getKeeperPosition(s)
+    result = []
+    for d, dr, dc in moveSteps:
+        s1 = try_move(np.copy(s), d)
+        if s1 is not None:
+            v = s[r + dr, c + dc]
+            result.append((d.upper() if isBox(v) or isBoxstar(v) else d, s1))
+    return result
 
-print(next_states(test))
 
+# Return the move that leads from state s to its successor s1 (see next_moves).
+def moveCode(s, s1):
+    r, c = getKeeperPosition(s)
+    r1, c1 = getKeeperPosition(s1)
+    for d, dr, dc in moveSteps:
+        if (r1, c1) == (r + dr, c + dc):
+            v = s[r1, c1]
+            return d.upper() if isBox(v) or isBoxstar(v) else d
+    raise ValueError('s1 is not a successor of s')
+
+
+# Replay a move string from state s and return the list of states, starting with s.
+# Upper and lower case are accepted alike; an impossible move raises ValueError.
+def replayMoves(s, moves):
+    states = [np.array(s)]
+    for d in moves:
+        s1 = try_move(np.copy(states[-1]), d.lower())
+        if s1 is None:
+            raise ValueError('illegal move {!r} after {} moves'.format(d, len(states) - 1))
+        states.append(s1)
+    return states
+
+
+# The outcome of a solved search.
+# moves is the solution in LURD notation: one letter per step, lower case for a walk and upper case for a push.
+# depth is len(moves), generated and expanded are the node counts of the search, and seconds is its wall time.
+class SolveResult(namedtuple('SolveResult', ['moves', 'depth', 'generated', 'expanded', 'seconds', 'start'])):
+    __slots__ = ()
+
+    # The list of states from start to goal, built by replaying the moves.
+    def states(self):
+        return replayMoves(self.start, self.moves)
+
+
+# Run A* (search.a_star_search) and return a SolveResult, or None if there is no solution.
+# With the default successors the moves are recorded while searching through next_moves, so no states are
+# copied to report the solution. Any other successors function works too; the move of every generated state
+# is then recovered with moveCode. hooks (a search.Hooks) receives the search events, e.g. progress reports.
+def solve(start_state, heuristic, goal_test=goal_test, successors=next_states, max_expanded=None, time_limit=None,
+          hooks=None):
+    if successors is next_states:
+        moves = next_moves
+    else:
+        def moves(s):
+            return [(moveCode(s, s1), s1) for s1 in successors(s)]
+    start_state = np.array(start_state)
+    start = time.perf_counter()
+    goal_node, node_generated, node_expanded = search.a_star_search(
+        start_state, goal_test, None, heuristic, max_expanded=max_expanded, time_limit=time_limit,
+        next_moves=moves, hooks=hooks)
+    seconds = time.perf_counter() - start
+    if goal_node is None:
+        return None
+    solution = search.move_string(goal_node)
+    return SolveResult(solution, len(solution), node_generated, node_expanded, seconds, start_state)
 
 
 # EXERCISE: Modify this function to compute the trivial
@@ -391,12 +463,210 @@ def manhattanDistance(location, options):
 
 
 
+# Per-level tables used by the UID heuristic.
+# Everything in here depends only on the walls and goals of a level, so it is
+# computed once per level and cached under levelKey(s). Cells are indexed on a
+# copy of the board padded with a ring of walls, which lets the neighbour
+# arithmetic below skip bound checks (off the board behaves like a wall, the
+# same as in try_move).
+# Both caches are LRU-bounded: levelCache keeps the tables of the last
+# LEVEL_CACHE_SIZE levels, and each level's boxCache the push costs of the
+# last BOX_CACHE_SIZE box configurations.
+UNREACHABLE = 10 ** 6
+DEADLOCK = 10 ** 6
+LEVEL_CACHE_SIZE = 16
+BOX_CACHE_SIZE = 1 << 17
+levelCache = OrderedDict()
+
+
+def cacheGet(cache, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def cachePut(cache, key, value, size):
+    cache[key] = value
+    if len(cache) > size:
+        cache.popitem(last=False)
+
+
+def levelKey(s):
+    goals = (s == star) | (s == boxstar) | (s == keeperstar)
+    return (s.shape, (s == wall).tobytes(), goals.tobytes())
+
+
+# Box distances to the given goals when the box is pushed alone on the board.
+# Runs a breadth-first search of box pulls backwards from the goals: a pull
+# moves the box from p to p+d and needs both p+d and p+2d (where the keeper
+# ends up) to be open. Cells in 'blocked' are treated as walls.
+def pullDistances(open_, width, goals, blocked=()):
+    dist = [UNREACHABLE] * len(open_)
+    frontier = []
+    for g in goals:
+        if g not in blocked:
+            dist[g] = 0
+            frontier.append(g)
+    steps = (1, -1, width, -width)
+    while frontier:
+        nxt = []
+        for p in frontier:
+            for d in steps:
+                q = p + d
+                k = q + d
+                if (open_[q] and open_[k] and dist[q] == UNREACHABLE
+                        and q not in blocked and k not in blocked):
+                    dist[q] = dist[p] + 1
+                    nxt.append(q)
+        frontier = nxt
+    return dist
+
+
+# A corridor cell is an open cell walled in on both sides along one axis.
+def isCorridor(open_, width, p):
+    return ((not open_[p - 1] and not open_[p + 1])
+            or (not open_[p - width] and not open_[p + width]))
+
+
+# The tables of the level of s, from levelCache or built and added to it.
+def levelTables(s):
+    key = levelKey(s)
+    tables = cacheGet(levelCache, key)
+    if tables is None:
+        tables = buildLevelTables(s)
+        cachePut(levelCache, key, tables, LEVEL_CACHE_SIZE)
+    return tables
+
+
+# Build the tables of the level of s without touching levelCache, so it can run on another thread.
+def buildLevelTables(s):
+    width = s.shape[1] + 2
+    padded = np.pad(s, 1, constant_values=wall)
+    flat = padded.ravel()
+    open_ = [not isWall(v) for v in flat]
+    goals = [int(p) for p in np.flatnonzero(
+        (flat == star) | (flat == boxstar) | (flat == keeperstar))]
+    goalDist = [pullDistances(open_, width, [g]) for g in goals]
+    nearest = pullDistances(open_, width, goals)
+    # For each corridor cell x, the cells from which a box can still reach a
+    # goal other than x while x stays occupied. A box outside that set can
+    # only be solved after whatever sits on x moves away.
+    escape = {}
+    for p in range(len(flat)):
+        if open_[p] and isCorridor(open_, width, p):
+            dist = pullDistances(open_, width, goals, blocked=(p,))
+            escape[p] = [d != UNREACHABLE for d in dist]
+    return {
+        'width': width,
+        'open': open_,
+        'goals': goals,
+        'goalIndex': {g: i for i, g in enumerate(goals)},
+        'goalDist': goalDist,
+        'dead': [d == UNREACHABLE for d in nearest],
+        'escape': escape,
+        'boxCache': OrderedDict(),
+    }
+
+
+# Helper for isFrozen: can the box at p never be pushed along 'axis'?
+# 'fixed' holds boxes that are already being treated as walls.
+def axisBlocked(t, boxes, p, axis, fixed):
+    open_, dead = t['open'], t['dead']
+    a, b = p - axis, p + axis
+    if not open_[a] or not open_[b] or a in fixed or b in fixed:
+        return True
+    if dead[a] and dead[b]:
+        return True
+    other = t['width'] if axis == 1 else 1
+    fixed = fixed | {p}
+    for n in (a, b):
+        if n in boxes and axisBlocked(t, boxes, n, other, fixed):
+            return True
+    return False
+
+
+# A box is frozen when it can be pushed along neither axis, either because of
+# walls or because its neighbours are boxes that are themselves frozen.
+def isFrozen(t, boxes, p):
+    return (axisBlocked(t, boxes, p, 1, frozenset())
+            and axisBlocked(t, boxes, p, t['width'], frozenset()))
+
+
+# Lower bound on the pushes needed for a box configuration. Returns DEADLOCK
+# if some box can never reach a goal.
+def boxCost(t, boxes):
+    goals, goalDist = t['goals'], t['goalDist']
+    goalIndex = t['goalIndex']
+    misplaced = [p for p in boxes if p not in goalIndex]
+    for p in misplaced:
+        if t['dead'][p] or isFrozen(t, boxes, p):
+            return DEADLOCK
+    # A box sitting on a goal in a corridor must be pushed off (and back on,
+    # or on to another goal) if some misplaced box cannot be solved without
+    # passing through or ending on its cell.
+    # This keeps h consistent: a push never takes a box from a cell that needs
+    # the goal cell x to one that does not (the pull search for escape[x]
+    # would have found the reverse pull), so the penalty only goes away when
+    # the box on x itself moves, and then its row of the matching drops by at
+    # most one. Two misplaced boxes that need each other's cells get no
+    # penalty: when they are adjacent they are frozen, and otherwise they can
+    # get past each other through a loop at no extra cost.
+    mustMove = set()
+    for p in boxes:
+        esc = t['escape'].get(p)
+        if p in goalIndex and esc is not None:
+            if any(not esc[q] for q in misplaced):
+                mustMove.add(p)
+    # Minimum-cost assignment of boxes to distinct goals, by dynamic
+    # programming over the set of goals already used.
+    layer = {0: 0}
+    for p in boxes:
+        costs = []
+        for i, g in enumerate(goals):
+            d = goalDist[i][p]
+            if g == p and p in mustMove:
+                d = 2
+            costs.append(d)
+        nxt = {}
+        for used, total in layer.items():
+            for i, d in enumerate(costs):
+                if d == UNREACHABLE or used & (1 << i):
+                    continue
+                key = used | (1 << i)
+                if total + d < nxt.get(key, UNREACHABLE):
+                    nxt[key] = total + d
+        if not nxt:
+            return DEADLOCK
+        layer = nxt
+    # int(): the tables may be NumPy views shared between processes (see artifacts.install).
+    return int(min(layer.values()))
+
+
 # EXERCISE: 
 # This function will be tested in various hard examples.
 # Objective: make A* solve problems as fast as possible.
 # TODO: change the function name to hUID, where UID is your student ID
+#
+# h = (minimum push cost of matching boxes to goals, with the corridor
+# penalty above) + (keeper steps needed to reach the nearest box).
+# Every move pushes at most one box by one square, and the keeper has to walk
+# next to a box before it can push anything, so both terms are admissible.
 def h905751487(s):
-    raise NotImplementedError()
+    t = levelTables(s)
+    width = t['width']
+    flat = np.pad(s, 1, constant_values=wall).ravel()
+    boxes = frozenset(int(p) for p in np.flatnonzero((flat == box) | (flat == boxstar)))
+    cost = cacheGet(t['boxCache'], boxes)
+    if cost is None:
+        cost = boxCost(t, boxes)
+        cachePut(t['boxCache'], boxes, cost, BOX_CACHE_SIZE)
+    if cost == 0 or cost >= DEADLOCK:
+        return cost
+    k = int(np.flatnonzero((flat == keeper) | (flat == keeperstar))[0])
+    kr, kc = divmod(k, width)
+    walk = min(abs(kr - r) + abs(kc - c) for r, c in (divmod(p, width) for p in boxes))
+    return cost + walk - 1
 
 
 # Some predefined problems with initial state s (array). Sokoban function will automatically transform it to numpy
@@ -408,7 +678,7 @@ def h905751487(s):
 # For most problems, we also provide 2 additional number per problem:
 #    1) # of nodes expanded by A* using our next-states and h0 heuristic.
 #    2) the depth of the optimal solution.
-# These numbers are located at the comments of the problems. For example, the first problem below 
+# These numbers are located at the comments of the problems. For example, the first problem (s1)
 # was solved by 80 nodes expansion of A* and its optimal solution depth is 7.
 # 
 # Your implementation may not result in the same number of nodes expanded, but it should probably
@@ -419,183 +689,18 @@ def h905751487(s):
 # Warning: some problems toward the end are quite hard and could be impossible to solve without a good heuristic!
 
 
-# [80,7]
-s1 = [[1, 1, 1, 1, 1, 1],
-      [1, 0, 3, 0, 0, 1],
-      [1, 0, 2, 0, 0, 1],
-      [1, 1, 0, 1, 1, 1],
-      [1, 0, 0, 0, 0, 1],
-      [1, 0, 0, 0, 4, 1],
-      [1, 1, 1, 1, 1, 1]]
-
-# [110,10],
-s2 = [[1, 1, 1, 1, 1, 1, 1],
-      [1, 0, 0, 0, 0, 0, 1],
-      [1, 0, 0, 0, 0, 0, 1],
-      [1, 0, 0, 2, 1, 4, 1],
-      [1, 3, 0, 0, 1, 0, 1],
-      [1, 1, 1, 1, 1, 1, 1]]
-
-# [211,12],
-s3 = [[1, 1, 1, 1, 1, 1, 1, 1, 1],
-      [1, 0, 0, 0, 1, 0, 0, 0, 1],
-      [1, 0, 0, 0, 2, 0, 3, 4, 1],
-      [1, 0, 0, 0, 1, 0, 0, 0, 1],
-      [1, 0, 0, 0, 1, 0, 0, 0, 1],
-      [1, 1, 1, 1, 1, 1, 1, 1, 1]]
-
-# [300,13],
-s4 = [[1, 1, 1, 1, 1, 1, 1],
-      [0, 0, 0, 0, 0, 1, 4],
-      [0, 0, 0, 0, 0, 0, 0],
-      [0, 0, 1, 1, 1, 0, 0],
-      [0, 0, 1, 0, 0, 0, 0],
-      [0, 2, 1, 0, 0, 0, 0],
-      [0, 3, 1, 0, 0, 0, 0]]
-
-# [551,10],
-s5 = [[1, 1, 1, 1, 1, 1],
-      [1, 1, 0, 0, 1, 1],
-      [1, 0, 0, 0, 0, 1],
-      [1, 4, 2, 2, 4, 1],
-      [1, 0, 0, 0, 0, 1],
-      [1, 1, 3, 1, 1, 1],
-      [1, 1, 1, 1, 1, 1]]
-
-# [722,12],
-s6 = [[1, 1, 1, 1, 1, 1, 1, 1],
-      [1, 0, 0, 0, 0, 0, 4, 1],
-      [1, 0, 0, 0, 2, 2, 3, 1],
-      [1, 0, 0, 1, 0, 0, 4, 1],
-      [1, 1, 1, 1, 1, 1, 1, 1]]
-
-# [1738,50],
-s7 = [[1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-      [0, 0, 1, 1, 1, 1, 0, 0, 0, 3],
-      [0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-      [0, 0, 0, 0, 0, 1, 0, 0, 1, 0],
-      [0, 0, 1, 0, 0, 1, 0, 0, 1, 0],
-      [0, 2, 1, 0, 0, 0, 0, 0, 1, 0],
-      [0, 0, 1, 0, 0, 0, 0, 0, 1, 4]]
-
-# [1763,22],
-s8 = [[1, 1, 1, 1, 1, 1],
-      [1, 4, 0, 0, 4, 1],
-      [1, 0, 2, 2, 0, 1],
-      [1, 2, 0, 1, 0, 1],
-      [1, 3, 0, 0, 4, 1],
-      [1, 1, 1, 1, 1, 1]]
-
-# [1806,41],
-s9 = [[1, 1, 1, 1, 1, 1, 1, 1, 1],
-      [1, 1, 1, 0, 0, 1, 1, 1, 1],
-      [1, 0, 0, 0, 0, 0, 2, 0, 1],
-      [1, 0, 1, 0, 0, 1, 2, 0, 1],
-      [1, 0, 4, 0, 4, 1, 3, 0, 1],
-      [1, 1, 1, 1, 1, 1, 1, 1, 1]]
-
-# [10082,51],
-s10 = [[1, 1, 1, 1, 1, 0, 0],
-       [1, 0, 0, 0, 1, 1, 0],
-       [1, 3, 2, 0, 0, 1, 1],
-       [1, 1, 0, 2, 0, 0, 1],
-       [0, 1, 1, 0, 2, 0, 1],
-       [0, 0, 1, 1, 0, 0, 1],
-       [0, 0, 0, 1, 1, 4, 1],
-       [0, 0, 0, 0, 1, 4, 1],
-       [0, 0, 0, 0, 1, 4, 1],
-       [0, 0, 0, 0, 1, 1, 1]]
-
-# [16517,48],
-s11 = [[1, 1, 1, 1, 1, 1, 1],
-       [1, 4, 0, 0, 0, 4, 1],
-       [1, 0, 2, 2, 1, 0, 1],
-       [1, 0, 2, 0, 1, 3, 1],
-       [1, 1, 2, 0, 1, 0, 1],
-       [1, 4, 0, 0, 4, 0, 1],
-       [1, 1, 1, 1, 1, 1, 1]]
-
-# [22035,38],
-s12 = [[0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0],
-       [1, 1, 1, 1, 1, 0, 0, 0, 1, 1, 1, 1],
-       [1, 0, 0, 0, 2, 0, 0, 0, 0, 0, 0, 1],
-       [1, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-       [1, 0, 0, 0, 2, 1, 1, 1, 0, 0, 0, 1],
-       [1, 0, 0, 0, 0, 1, 0, 1, 4, 0, 4, 1],
-       [1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1]]
-
-# [26905,28],
-s13 = [[1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-       [1, 4, 0, 0, 0, 0, 0, 2, 0, 1],
-       [1, 0, 2, 0, 0, 0, 0, 0, 4, 1],
-       [1, 0, 3, 0, 0, 0, 0, 0, 2, 1],
-       [1, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-       [1, 0, 0, 0, 0, 0, 0, 0, 4, 1],
-       [1, 1, 1, 1, 1, 1, 1, 1, 1, 1]]
-
-# [41715,53],
-s14 = [[0, 0, 1, 0, 0, 0, 0],
-       [0, 2, 1, 4, 0, 0, 0],
-       [0, 2, 0, 4, 0, 0, 0],
-       [3, 2, 1, 1, 1, 0, 0],
-       [0, 0, 1, 4, 0, 0, 0]]
-
-# [48695,44],
-s15 = [[1, 1, 1, 1, 1, 1, 1],
-       [1, 0, 0, 0, 0, 0, 1],
-       [1, 0, 0, 2, 2, 0, 1],
-       [1, 0, 2, 0, 2, 3, 1],
-       [1, 4, 4, 1, 1, 1, 1],
-       [1, 4, 4, 1, 0, 0, 0],
-       [1, 1, 1, 1, 0, 0, 0]]
-
-# [91344,111],
-s16 = [[1, 1, 1, 1, 1, 0, 0, 0],
-       [1, 0, 0, 0, 1, 0, 0, 0],
-       [1, 2, 1, 0, 1, 1, 1, 1],
-       [1, 4, 0, 0, 0, 0, 0, 1],
-       [1, 0, 0, 5, 0, 5, 0, 1],
-       [1, 0, 5, 0, 1, 0, 1, 1],
-       [1, 1, 1, 0, 3, 0, 1, 0],
-       [0, 0, 1, 1, 1, 1, 1, 0]]
-
-# [3301278,76],
-# Warning: This problem is very hard and could be impossible to solve without a good heuristic!
-s17 = [[1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-       [1, 3, 0, 0, 1, 0, 0, 0, 4, 1],
-       [1, 0, 2, 0, 2, 0, 0, 4, 4, 1],
-       [1, 0, 2, 2, 2, 1, 1, 4, 4, 1],
-       [1, 0, 0, 0, 0, 1, 1, 4, 4, 1],
-       [1, 1, 1, 1, 1, 1, 0, 0, 0, 0]]
-
-# [??,25],
-s18 = [[0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-       [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-       [1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1],
-       [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
-       [0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-       [0, 0, 0, 0, 0, 0, 0, 0, 3, 0, 0, 0, 0, 0, 0, 0],
-       [0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0],
-       [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
-       [1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1],
-       [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-       [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-       [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 4, 1, 0, 0, 0, 0],
-       [0, 0, 0, 0, 1, 0, 2, 0, 0, 0, 0, 1, 0, 0, 0, 0],
-       [0, 0, 0, 0, 1, 0, 2, 0, 0, 0, 4, 1, 0, 0, 0, 0]]
-
-# [??,21],
-s19 = [[0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
-       [0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
-       [0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
-       [1, 1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1],
-       [0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0],
-       [0, 0, 0, 0, 0, 0, 3, 0, 0, 0, 2, 0],
-       [0, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 4],
-       [1, 1, 1, 1, 0, 0, 0, 0, 1, 1, 1, 1],
-       [0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
-       [0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
-       [0, 0, 0, 1, 0, 2, 0, 4, 1, 0, 0, 0]]
+# The problems s1 ... s19 (with the numbers above as comments) are stored in builtin.xsb, next to this file.
+# They are read when one of them is used, e.g. sokoban(hw3.s1, h1) or from hw3 import s1, and every use returns a
+# fresh copy. builtinNames are in __all__ (at the end of this file), so from hw3 import * includes them too.
+builtinNames = ['s{}'.format(i) for i in range(1, 20)]
+
+
+def __getattr__(name):
+    if name in builtinNames:
+        # levels is imported here rather than at the top because it depends on this module.
+        import levels
+        return levels.builtin()[name].rows
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
 
 
 # Utility functions for printing states and moves.
@@ -649,20 +754,17 @@ def printsquare(v):
 
 
 # Print a state
+# The whole state is rendered into one string (see render.py) and printed at once.
+# render is imported here rather than at the top because it depends on this module.
 def printstate(s):
-    row = s.shape[0]
-    col = s.shape[1]
-    for i in range(row):
-        for j in range(col):
-            printsquare(s[i, j])
-        print('\n')
+    import render
+    print(render.frame(s))
 
 
-# Print a list of states with delay.
+# Print a list of states, separated by blank lines.
 def printlists(lists):
-    for states in (lists):
-        printstate(states)
-        print('\n')
+    import render
+    render.export(lists, sys.stdout)
 
 
 # if __name__ == "__main__":
@@ -674,3 +776,7 @@ def printlists(lists):
     # sokoban(s3, h0)
 
     # sokoban(s4, h0)
+
+
+# Everything public defined above, plus the builtin problems loaded by __getattr__.
+__all__ = [name for name in list(globals()) if not name.startswith('_')] + builtinNames
@@ -0,0 +1,142 @@
+"""Reading and writing levels in the XSB text format.
+
+Board rows use '#' wall, ' ' (or '-' / '_') floor, '$' box, '@' keeper,
+'.' goal, '*' box on goal and '+' keeper on goal. Everything else in the
+file is metadata:
+
+* 'Key: value' lines directly after a board (up to the next blank line)
+  belong to that board, e.g. 'Title: ...' or 'Author: ...';
+* a 'Comment:' line opens a free-text block closed by 'Comment-End:';
+* any other text (';' lines, free-standing titles) belongs to the next
+  board.
+
+iter_xsb() reads one line at a time and yields each Level as soon as its
+trailing metadata is complete, so whole collections are never held in
+memory.
+"""
+
+import functools
+import os
+import re
+from collections import namedtuple
+
+from hw3 import blank, wall, box, keeper, star, boxstar, keeperstar
+
+CODES = {'#': wall, ' ': blank, '-': blank, '_': blank, '$': box, '@': keeper, '.': star,
+         '*': boxstar, '+': keeperstar}
+CHARS = {blank: ' ', wall: '#', box: '$', keeper: '@', star: '.', boxstar: '*', keeperstar: '+'}
+
+BOARD_ROW = re.compile(r'^(?=.*[#$@.*+\-_])[#$@.*+ \-_]+$')
+KEY_VALUE = re.compile(r'^([A-Za-z][\w\- ]*):\s*(.*)$')
+
+# The problems s1 ... s19 of hw3 (see builtin()).
+BUILTIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'builtin.xsb')
+
+# rows: list of lists of hw3 codes, padded with floor to a rectangle.
+# comments: free text lines; metadata: dict of 'Key: value' lines.
+Level = namedtuple('Level', ['title', 'rows', 'comments', 'metadata'])
+
+
+def parse_rows(lines):
+    width = max(len(line) for line in lines)
+    return [[CODES[ch] for ch in line.ljust(width)] for line in lines]
+
+
+def make_level(board, comments, metadata, title):
+    return Level(metadata.get('Title', title), parse_rows(board), comments, metadata)
+
+
+def iter_xsb(source):
+    """
+    :param source: a path, an open text file, or any iterable of lines
+    :return: a generator of Level, in file order
+    """
+    if isinstance(source, str):
+        with open(source) as f:
+            yield from iter_xsb(f)
+        return
+
+    # title is the last one-line comment before the board, used when there is no 'Title:' line.
+    board, comments, metadata, title = [], [], {}, None
+    next_comments, next_title = [], None
+    after_board = False
+    in_comment = False
+    for line in source:
+        line = line.rstrip('\r\n')
+        if in_comment:
+            if line.strip().lower().startswith('comment-end:'):
+                in_comment = False
+            else:
+                comments.append(line)
+            continue
+        if BOARD_ROW.match(line):
+            if after_board:
+                yield make_level(board, comments, metadata, title)
+                board, comments, metadata, title = [], next_comments, {}, next_title
+                next_comments, next_title = [], None
+                after_board = False
+            board.append(line)
+            continue
+        if board and not after_board:
+            after_board = True
+        if not line.strip():
+            if after_board:
+                yield make_level(board, comments, metadata, title)
+                board, comments, metadata, title = [], next_comments, {}, next_title
+                next_comments, next_title = [], None
+                after_board = False
+            continue
+        match = KEY_VALUE.match(line.strip())
+        if match and match.group(1).lower() == 'comment' and not match.group(2):
+            in_comment = True
+        elif match and after_board:
+            metadata[match.group(1)] = match.group(2)
+        elif after_board:
+            next_comments.append(line)
+            next_title = line.lstrip(';').strip() or next_title
+        else:
+            comments.append(line)
+            title = line.lstrip(';').strip() or title
+    if board:
+        yield make_level(board, comments, metadata, title)
+
+
+def read_xsb(source):
+    """
+    :return: all levels of source as a list (see iter_xsb)
+    """
+    return list(iter_xsb(source))
+
+
+def format_xsb(rows, title=None):
+    """
+    :param rows: a state (list of lists or numpy array of hw3 codes)
+    :param title: optional title, written as a 'Title:' line after the board
+    :return: the level as XSB text, ending with a blank line
+    """
+    lines = []
+    for row in rows:
+        line = ''.join(CHARS[int(v)] for v in row)
+        # Trailing floor is written as '-' so that it survives editors and the
+        # reader keeps the exact width (and rows of bare floor stay board rows).
+        body = line.rstrip(' ')
+        lines.append(body + '-' * (len(line) - len(body)))
+    if title is not None:
+        lines.append('Title: {}'.format(title))
+    return '\n'.join(lines) + '\n\n'
+
+
+@functools.lru_cache(maxsize=None)
+def read_builtin():
+    with open(BUILTIN) as f:
+        return tuple(iter_xsb(f))
+
+
+def builtin():
+    """
+    :return: dict of the builtin hw3 problems by title ('s1' ... 's19'), read from BUILTIN on first use;
+             every call returns fresh copies, so callers may modify them
+    """
+    return {level.title: level._replace(rows=[row[:] for row in level.rows], comments=list(level.comments),
+                                        metadata=dict(level.metadata))
+            for level in read_builtin()}
@@ -0,0 +1,122 @@
+"""Perimeter search around the goal region.
+
+A breadth-first search backwards from every goal configuration (all boxes
+on goals, keeper anywhere it can stand) records the exact number of moves
+to the goal for every state within `depth` moves of it. The forward A*
+then uses that table as a perfect heuristic inside the perimeter and
+max(h, depth + 1) outside it, and stops as soon as it pops a state inside
+the perimeter: that state's f is exact and minimal, so the remaining moves
+can be read off the table.
+"""
+
+from itertools import combinations
+
+import numpy as np
+
+import search
+from hw3 import blank, wall, box, keeper, star, boxstar, keeperstar, h0
+from simplify import STEPS, keeper_region
+
+DEFAULT_DEPTH = 8
+
+
+class Perimeter:
+    def __init__(self, start_state, depth=DEFAULT_DEPTH, heuristic=h0):
+        """
+
+        :param start_state: the start state (numpy array); fixes the walls, goals, box count and dtype
+        :param depth: radius of the perimeter in moves
+        :param heuristic: an admissible heuristic to fall back on outside the perimeter
+        """
+        self.depth = depth
+        self.base = heuristic
+        self.table = self.build(np.asarray(start_state), depth)
+
+    @staticmethod
+    def build(s, depth):
+        goal_mask = (s == star) | (s == boxstar) | (s == keeperstar)
+        region = keeper_region(s)
+        # Cells walled off from the keeper never change, so they keep their contents in every
+        # tabled state. A box stranded there off a goal makes the level unsolvable.
+        if np.any(~region & (s == box)):
+            return {}
+        empty = np.where(s == wall, wall, np.where(goal_mask, star, blank)).astype(s.dtype)
+        empty[~region] = s[~region]
+        cells = {(int(r), int(c)) for r, c in zip(*np.nonzero(region))}
+        goals = [(int(r), int(c)) for r, c in zip(*np.nonzero(goal_mask & region))]
+        n_boxes = int(np.count_nonzero(region & ((s == box) | (s == boxstar))))
+
+        def encode(k, boxes):
+            a = np.copy(empty)
+            for p in boxes:
+                a[p] = boxstar if goal_mask[p] else box
+            a[k] = keeperstar if goal_mask[k] else keeper
+            return a.tobytes()
+
+        table = {}
+        frontier = []
+        for boxes in combinations(goals, n_boxes):
+            boxes = frozenset(boxes)
+            for k in cells - boxes:
+                table[encode(k, boxes)] = 0
+                frontier.append((k, boxes))
+
+        # Predecessors of (k, boxes): the keeper stepped in from k - d, and if
+        # a box sits at k + d it may have been pushed there from k.
+        for distance in range(1, depth + 1):
+            nxt = []
+            for (kr, kc), boxes in frontier:
+                for dr, dc in STEPS:
+                    prev = (kr - dr, kc - dc)
+                    if prev not in cells or prev in boxes:
+                        continue
+                    candidates = [boxes]
+                    pushed = (kr + dr, kc + dc)
+                    if pushed in boxes:
+                        candidates.append((boxes - {pushed}) | {(kr, kc)})
+                    for b in candidates:
+                        key = encode(prev, b)
+                        if key not in table:
+                            table[key] = distance
+                            nxt.append((prev, b))
+            frontier = nxt
+        return table
+
+    def heuristic(self, s):
+        d = self.table.get(s.tobytes())
+        if d is not None:
+            return d
+        return max(self.base(s), self.depth + 1)
+
+    def goal_test(self, s):
+        return s.tobytes() in self.table
+
+    def complete(self, s, goal_test, next_states):
+        """
+        :param s: a state inside the perimeter
+        :return: an optimal path from s to a goal state, s included
+        """
+        path = [s]
+        d = self.table[s.tobytes()]
+        while not goal_test(s):
+            s = next(n for n in next_states(s) if self.table.get(n.tobytes()) == d - 1)
+            d -= 1
+            path.append(s)
+        return path
+
+
+def a_star_search(start_state, goal_test, next_states, heuristic, depth=DEFAULT_DEPTH):
+    """
+    search.a_star_search that stops at the perimeter and appends the tabled path to the goal.
+
+    :return: (goal node or None, nodes generated, nodes expanded); the counts cover the forward search only
+    """
+    perimeter = Perimeter(start_state, depth, heuristic)
+    node, generated, expanded = search.a_star_search(
+        start_state, perimeter.goal_test, next_states, perimeter.heuristic)
+    if node is None:
+        return None, generated, expanded
+    for s in perimeter.complete(node.state1, goal_test, next_states)[1:]:
+        cost = node.cost + 1
+        node = search.SearchNode(s, node, cost, cost, search.default_key(s))
+    return node, generated, expanded
@@ -0,0 +1,102 @@
+"""Race several search configurations on one level.
+
+Each configuration runs in its own process. The first configuration that
+is guaranteed to be optimal and finishes wins, and the other processes
+are terminated. A solution from a configuration without that guarantee
+(e.g. weighted A*) is kept as a fallback and returned only if no optimal
+configuration finishes within the time limit.
+"""
+
+import multiprocessing
+import queue
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import search
+from hw3 import SolveResult, goal_test, next_moves, h1, h905751487
+
+POLL_INTERVAL = 0.1
+
+# engine: a search function with the a_star_search contract that accepts next_moves; options: extra keyword
+# arguments.
+# optimal: whether the configuration always returns an optimal solution.
+Config = namedtuple('Config', ['name', 'engine', 'heuristic', 'options', 'optimal'])
+
+DEFAULT_CONFIGS = [
+    Config('a_star/h1', search.a_star_search, h1, {}, True),
+    Config('a_star/hUID', search.a_star_search, h905751487, {}, True),
+    Config('ida_star/hUID', search.ida_star_search, h905751487, {}, True),
+    Config('weighted_a_star/hUID', search.a_star_search, h905751487, {'weight': 2}, False),
+]
+
+# status is 'solved', 'unsolvable' or 'error'; solution is the hw3.SolveResult of a solved level, or None.
+PortfolioResult = namedtuple('PortfolioResult', ['name', 'status', 'solution', 'depth', 'optimal',
+                                                 'generated', 'expanded', 'seconds'])
+
+
+def run_config(config, level, results):
+    start = time.perf_counter()
+    state = np.array(level)
+    try:
+        node, generated, expanded = config.engine(state, goal_test, None, config.heuristic,
+                                                  next_moves=next_moves, **config.options)
+    except Exception:
+        results.put(PortfolioResult(config.name, 'error', None, None, config.optimal, None, None,
+                                    time.perf_counter() - start))
+        return
+    seconds = time.perf_counter() - start
+    if node is None:
+        results.put(PortfolioResult(config.name, 'unsolvable', None, None, config.optimal,
+                                    generated, expanded, seconds))
+        return
+    moves = search.move_string(node)
+    solution = SolveResult(moves, len(moves), generated, expanded, seconds, state)
+    results.put(PortfolioResult(config.name, 'solved', solution, solution.depth, config.optimal,
+                                generated, expanded, seconds))
+
+
+def solve_portfolio(level, configs=None, time_limit=None):
+    """
+    :param level: the start state (list of lists or numpy array)
+    :param configs: list of Config (default: DEFAULT_CONFIGS)
+    :param time_limit: seconds to wait for an optimal result
+    :return: the winning PortfolioResult, the fallback if no optimal configuration finished in time,
+             or None if nothing finished
+    """
+    configs = DEFAULT_CONFIGS if configs is None else configs
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    ctx = multiprocessing.get_context()
+    results = ctx.Queue()
+    processes = [ctx.Process(target=run_config, args=(config, level, results), daemon=True)
+                 for config in configs]
+    for p in processes:
+        p.start()
+
+    fallback = None
+    remaining = len(configs)
+    try:
+        while remaining:
+            try:
+                result = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                # A worker killed from outside (e.g. by the OOM killer) never reports back.
+                if not any(p.is_alive() for p in processes) and results.empty():
+                    break
+                continue
+            remaining -= 1
+            if result.status == 'error':
+                continue
+            if result.optimal:
+                return result
+            if fallback is None:
+                fallback = result
+        return fallback
+    finally:
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+            p.join()
@@ -0,0 +1,87 @@
+"""Fast text rendering of states.
+
+frame() turns a whole state into one string with a single lookup-table
+indexing step instead of one print() per cell. Replay draws a sequence of
+states on an ANSI terminal: the first frame in full, every later one by
+rewriting only the cells that changed, each as a single write. export()
+writes all frames of a solution to a file for offline inspection.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from levels import CHARS
+
+GLYPHS = np.array([CHARS.get(code, '?') for code in range(8)])
+
+CLEAR = '\x1b[2J'
+HOME = '\x1b[H'
+
+
+def move_to(row, col):
+    return '\x1b[{};{}H'.format(row + 1, col + 1)
+
+
+def frame(s):
+    """
+    :param s: a state (list of lists or numpy array of hw3 codes)
+    :return: the state as text, one line per row, without a trailing newline
+    """
+    return '\n'.join(map(''.join, GLYPHS[np.asarray(s)].tolist()))
+
+
+class Replay:
+    def __init__(self, out=None):
+        """
+        :param out: a text stream connected to an ANSI terminal (default: sys.stdout)
+        """
+        self.out = out or sys.stdout
+        self.previous = None
+
+    def draw(self, s):
+        """
+        Show s, redrawing only the cells that differ from the previously drawn state.
+        The cursor is left on the line below the board.
+        """
+        s = np.array(s)
+        if self.previous is None or self.previous.shape != s.shape:
+            parts = [CLEAR, HOME, frame(s)]
+        else:
+            rows, cols = np.nonzero(s != self.previous)
+            parts = [move_to(r, c) + GLYPHS[s[r, c]] for r, c in zip(rows.tolist(), cols.tolist())]
+        parts.append(move_to(s.shape[0], 0))
+        self.out.write(''.join(parts))
+        self.out.flush()
+        self.previous = s
+
+
+def replay(states, out=None, delay=0.0):
+    """
+    Animate a list of states (e.g. SolveResult.states()) on an ANSI terminal.
+
+    :param delay: seconds to wait after each frame
+    """
+    screen = Replay(out)
+    for s in states:
+        screen.draw(s)
+        if delay:
+            time.sleep(delay)
+
+
+def export(states, file, separator='\n'):
+    """
+    Write every state as a frame followed by separator.
+
+    :param file: a path or a text stream
+    :return: the number of frames written
+    """
+    if isinstance(file, str):
+        with open(file, 'w') as f:
+            return export(states, f, separator)
+    count = 0
+    for s in states:
+        file.write(frame(s) + '\n' + separator)
+        count += 1
+    return count
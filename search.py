@@ -0,0 +1,367 @@
+import time
+from collections import namedtuple
+from heapq import heappush, heappop
+
+
+class SearchNode:
+    __slots__ = ('state', 'state1', 'parent', 'cost', 'evaluation', 'move')
+
+    def __init__(self, state, parent, cost, evaluation, key, move=None):
+        """
+        Same fields as astar.PathNode, except that the closed-set key is
+        computed by the caller instead of being rebuilt cell by cell.
+
+        :param state: the current state (numpy array)
+        :param parent: the previous node (SearchNode)
+        :param cost: the cost from the start state to the current state i.e. g(n)
+        :param evaluation: the state value f(n) = g(n) + h(n)
+        :param key: the closed-set key of the state
+        :param move: the move that led from parent to this state, if the search records moves
+        """
+        self.state = key
+        self.state1 = state
+        self.parent = parent
+        self.cost = cost
+        self.evaluation = evaluation
+        self.move = move
+
+    def __lt__(self, other):
+        return self.evaluation < other.evaluation
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, message, node_generated, node_expanded):
+        super().__init__(message)
+        self.node_generated = node_generated
+        self.node_expanded = node_expanded
+
+
+class TimeBudgetExceeded(BudgetExceeded):
+    pass
+
+
+# A snapshot of a running search for Hooks.on_progress. f_bound is the f of the node being expanded,
+# frontier and closed the sizes of the open list and the closed set, rate the expansions per second
+# since the previous report and elapsed the seconds since the search (or this run of it) started.
+Progress = namedtuple('Progress', ['f_bound', 'frontier', 'closed', 'generated', 'expanded', 'rate', 'elapsed'])
+
+# Number of expansions between two clock reads for on_progress and time_limit.
+CLOCK_EVERY = 256
+
+
+class Hooks:
+    EVENTS = ('on_expand', 'on_generate', 'on_goal', 'on_progress', 'on_sample')
+
+    def __init__(self, progress_interval=1.0, sample_every=1000, **handlers):
+        """
+        Event subscriptions for a search. The engine looks every handler up once when it starts; an
+        event nobody subscribed to costs one local None check where it would fire.
+
+        on_expand(node) fires for every expanded node, on_generate(node) for every node put on the
+        open list, on_goal(node, generated, expanded) once when a goal is found, on_progress(progress)
+        at most every progress_interval seconds with a Progress, and on_sample(open_list, closed,
+        generated, expanded) every sample_every expansions with the live open list and closed set
+        (which handlers must not modify), and once more when a goal is found.
+
+        :param progress_interval: seconds between two on_progress events
+        :param sample_every: expansions between two on_sample events
+        :param handlers: initial handlers by event name, e.g. on_goal=print
+        """
+        self.progress_interval = progress_interval
+        self.sample_every = sample_every
+        self.handlers = {event: [] for event in self.EVENTS}
+        for event, handler in handlers.items():
+            self.add(event, handler)
+
+    def add(self, event, handler):
+        if event not in self.handlers:
+            raise ValueError('unknown search event {!r}'.format(event))
+        self.handlers[event].append(handler)
+
+    def subscribe(self, subscriber):
+        """
+        Add every method of subscriber named after an event, e.g. an exporter object with on_progress.
+        """
+        for event in self.EVENTS:
+            handler = getattr(subscriber, event, None)
+            if handler is not None:
+                self.add(event, handler)
+
+    def handler(self, event):
+        """
+        :return: a function calling every handler of event, or None if there is none
+        """
+        handlers = self.handlers[event]
+        if not handlers:
+            return None
+        if len(handlers) == 1:
+            return handlers[0]
+
+        def fan_out(*args):
+            for handler in handlers:
+                handler(*args)
+
+        return fan_out
+
+
+def default_key(s):
+    return s.tobytes()
+
+
+def move_string(node):
+    """
+    :return: the moves recorded along the path from the start to node, joined into one string
+    """
+    moves = []
+    while node.parent is not None:
+        moves.append(node.move)
+        node = node.parent
+    return ''.join(reversed(moves))
+
+
+def run(steps):
+    """
+    Drive a search generator such as iter_a_star_search to completion.
+
+    :return: the generator's return value
+    """
+    try:
+        while True:
+            next(steps)
+    except StopIteration as stop:
+        return stop.value
+
+
+def a_star_search(start_state, goal_test, next_states, heuristic, state_key=None,
+                  max_expanded=None, time_limit=None, weight=1, next_moves=None, closed=None, hooks=None):
+    """
+    A* with the same contract and expansion order as astar.a_star_search.
+    States that map to the same state_key are treated as duplicates.
+    With weight > 1 this is weighted A* (f = g + weight * h): usually much faster,
+    but the solution can be up to weight times longer than optimal.
+
+    :param start_state:
+    :param goal_test: a function, return true only when the input is the goal state
+    :param next_states: a function, return a list of all successor states
+    :param heuristic: a function, return the heuristic function value of the given state
+    :param state_key: a function, return a hashable key for the closed set (default: the raw array bytes)
+    :param max_expanded: stop with BudgetExceeded after expanding this many nodes
+    :param time_limit: stop with TimeBudgetExceeded (a BudgetExceeded) after this many seconds
+    :param weight: factor applied to the heuristic
+    :param next_moves: a function, return a list of (move, successor state) pairs; when given it is
+                       used instead of next_states and every node records its move (see move_string)
+    :param closed: an empty mapping from state keys to costs to use as the closed set, e.g. a
+                   closedset.ClosedSet (default: a dict)
+    :param hooks: a Hooks with the event handlers to call during the search
+    :return: (goal node or None, nodes generated, nodes expanded)
+    """
+    return run(iter_a_star_search(start_state, goal_test, next_states, heuristic, state_key,
+                                  max_expanded, time_limit, weight, next_moves=next_moves, closed=closed,
+                                  hooks=hooks))
+
+
+def iter_a_star_search(start_state, goal_test, next_states, heuristic, state_key=None,
+                       max_expanded=None, time_limit=None, weight=1, yield_every=None, next_moves=None,
+                       checkpoint=None, closed=None, hooks=None):
+    """
+    Generator version of a_star_search that yields None after every yield_every expansions, so
+    that the caller can interleave other work. Its return value (the StopIteration value) is the
+    result of a_star_search. Closing the generator abandons the search.
+
+    :param checkpoint: called as checkpoint(open_list, explored, node_generated, node_expanded)
+                       after every expansion (see checkpoint.Checkpoint)
+    """
+    if state_key is None:
+        state_key = default_key
+    open_list = [SearchNode(start_state, None, 0, weight * heuristic(start_state), state_key(start_state))]
+    explored = dict() if closed is None else closed
+    return (yield from iter_a_star_from(open_list, explored, 1, 0, goal_test, next_states, heuristic, state_key,
+                                        max_expanded, time_limit, weight, yield_every, next_moves, checkpoint,
+                                        hooks))
+
+
+def iter_a_star_from(open_list, explored, node_generated, node_expanded, goal_test, next_states, heuristic,
+                     state_key, max_expanded=None, time_limit=None, weight=1, yield_every=None,
+                     next_moves=None, checkpoint=None, hooks=None):
+    """
+    The main loop of iter_a_star_search, continuing from a given open list (a heap of SearchNode),
+    closed set (key -> cost) and counters, e.g. those restored from a checkpoint.
+    """
+    started = time.monotonic()
+    deadline = None if time_limit is None else started + time_limit
+    on_expand = on_generate = on_goal = on_progress = on_sample = None
+    if hooks is not None:
+        on_expand = hooks.handler('on_expand')
+        on_generate = hooks.handler('on_generate')
+        on_goal = hooks.handler('on_goal')
+        on_progress = hooks.handler('on_progress')
+        on_sample = hooks.handler('on_sample')
+        next_report = started + hooks.progress_interval
+        last_report, last_expanded = started, node_expanded
+
+    while open_list:
+        node = heappop(open_list)
+        if goal_test(node.state1):
+            if on_sample is not None:
+                on_sample(open_list, explored, node_generated, node_expanded)
+            if on_goal is not None:
+                on_goal(node, node_generated, node_expanded)
+            return node, node_generated, node_expanded
+        old_cost = explored.get(node.state)
+        if old_cost is not None and old_cost <= node.cost:
+            continue
+        if max_expanded is not None and node_expanded >= max_expanded:
+            raise BudgetExceeded('expansion budget exhausted', node_generated, node_expanded)
+        explored[node.state] = node.cost
+        node_expanded += 1
+        if on_expand is not None:
+            on_expand(node)
+        if (deadline is not None or on_progress is not None) and node_expanded % CLOCK_EVERY == 0:
+            now = time.monotonic()
+            if deadline is not None and now > deadline:
+                raise TimeBudgetExceeded('time budget exhausted', node_generated, node_expanded)
+            if on_progress is not None and now >= next_report:
+                rate = (node_expanded - last_expanded) / max(now - last_report, 1e-9)
+                on_progress(Progress(node.evaluation, len(open_list), len(explored), node_generated,
+                                     node_expanded, rate, now - started))
+                next_report = now + hooks.progress_interval
+                last_report, last_expanded = now, node_expanded
+        new_cost = node.cost + 1
+        if next_moves is None:
+            for s in next_states(node.state1):
+                child = SearchNode(s, node, new_cost, new_cost + weight * heuristic(s), state_key(s))
+                heappush(open_list, child)
+                node_generated += 1
+                if on_generate is not None:
+                    on_generate(child)
+        else:
+            for move, s in next_moves(node.state1):
+                child = SearchNode(s, node, new_cost, new_cost + weight * heuristic(s), state_key(s), move)
+                heappush(open_list, child)
+                node_generated += 1
+                if on_generate is not None:
+                    on_generate(child)
+        if on_sample is not None and node_expanded % hooks.sample_every == 0:
+            on_sample(open_list, explored, node_generated, node_expanded)
+        if checkpoint is not None:
+            checkpoint(open_list, explored, node_generated, node_expanded)
+        if yield_every is not None and node_expanded % yield_every == 0:
+            yield
+
+    return None, node_generated, node_expanded
+
+
+def ida_star_search(start_state, goal_test, next_states, heuristic, state_key=None,
+                    max_expanded=None, time_limit=None, next_moves=None):
+    """
+    Iterative deepening A*: depth-first searches bounded by f, raising the bound to the
+    smallest f that exceeded it until a goal is found. Memory is linear in the solution depth
+    apart from a per-iteration table of the cheapest g seen for each state, which prunes the
+    many transpositions caused by keeper walks.
+
+    :param next_moves: as in a_star_search
+    :return: (goal node or None, nodes generated, nodes expanded), summed over all iterations
+    """
+    if state_key is None:
+        state_key = default_key
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    root = SearchNode(start_state, None, 0, heuristic(start_state), state_key(start_state))
+    node_generated = 1
+    node_expanded = 0
+    bound = root.evaluation
+
+    while True:
+        best_g = {root.state: 0}
+        next_bound = None
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.evaluation > bound:
+                if next_bound is None or node.evaluation < next_bound:
+                    next_bound = node.evaluation
+                continue
+            if goal_test(node.state1):
+                return node, node_generated, node_expanded
+            if max_expanded is not None and node_expanded >= max_expanded:
+                raise BudgetExceeded('expansion budget exhausted', node_generated, node_expanded)
+            node_expanded += 1
+            if deadline is not None and node_expanded % CLOCK_EVERY == 0 and time.monotonic() > deadline:
+                raise TimeBudgetExceeded('time budget exhausted', node_generated, node_expanded)
+            new_cost = node.cost + 1
+            if next_moves is None:
+                successors = [(None, s) for s in next_states(node.state1)]
+            else:
+                successors = next_moves(node.state1)
+            for move, s in successors:
+                key = state_key(s)
+                old_cost = best_g.get(key)
+                if old_cost is not None and old_cost <= new_cost:
+                    continue
+                best_g[key] = new_cost
+                stack.append(SearchNode(s, node, new_cost, new_cost + heuristic(s), key, move))
+                node_generated += 1
+        if next_bound is None:
+            return None, node_generated, node_expanded
+        bound = next_bound
+
+
+class PartialNode(SearchNode):
+    __slots__ = ('lower',)
+
+    def __init__(self, state, parent, cost, evaluation, key):
+        """
+        A SearchNode that remembers which successors it has already put on the open list:
+        those with lower < f <= evaluation.
+        """
+        super().__init__(state, parent, cost, evaluation, key)
+        self.lower = None
+
+
+def partial_expansion_a_star_search(start_state, goal_test, next_states, heuristic, state_key=None):
+    """
+    Partial Expansion A* (PEA*). Expanding a node only stores the successors whose f is at most
+    the node's stored value F; if some successors were left out, the node goes back on the open
+    list with F raised to the smallest left-out f. Successors whose f exceeds the optimal cost
+    are therefore never stored, at the price of regenerating the successors of re-inserted nodes.
+
+    :return: (goal node or None, nodes generated, nodes expanded); generated counts the nodes put
+             on the open list and expanded counts each node once, however often it is re-expanded
+    """
+    if state_key is None:
+        state_key = default_key
+    open_list = [PartialNode(start_state, None, 0, heuristic(start_state), state_key(start_state))]
+    explored = dict()
+
+    node_generated = 1
+    node_expanded = 0
+
+    while open_list:
+        node = heappop(open_list)
+        if goal_test(node.state1):
+            return node, node_generated, node_expanded
+        old_cost = explored.get(node.state)
+        if node.lower is None:
+            if old_cost is not None and old_cost <= node.cost:
+                continue
+            explored[node.state] = node.cost
+            node_expanded += 1
+        elif old_cost < node.cost:
+            continue
+        bound = node.evaluation
+        lower = node.lower
+        next_bound = None
+        new_cost = node.cost + 1
+        for s in next_states(node.state1):
+            f = new_cost + heuristic(s)
+            if f > bound:
+                if next_bound is None or f < next_bound:
+                    next_bound = f
+            elif lower is None or f > lower:
+                heappush(open_list, PartialNode(s, node, new_cost, f, state_key(s)))
+                node_generated += 1
+        if next_bound is not None:
+            node.lower = bound
+            node.evaluation = next_bound
+            heappush(open_list, node)
+
+    return None, node_generated, node_expanded
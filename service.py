@@ -0,0 +1,71 @@
+"""Asyncio entry point for embedding the solver in an event loop.
+
+solve() runs the search on the event loop itself, handing control back
+every yield_every expansions so that other tasks keep running. The task
+can be cancelled, and timeout cancels it after that many seconds. The
+per-level tables of h905751487 take long enough to build that they are
+built in the loop's default executor first and then added to hw3's
+level cache on the loop thread. When an executor (e.g. a
+ProcessPoolExecutor) is given, the whole search runs there instead and
+the event loop only awaits the result. Such a search cannot be
+interrupted from the outside, so the timeout is enforced only by its own
+time budget, and running out of it (a 'timeout' result) raises
+asyncio.TimeoutError as well.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+import batch
+import hw3
+import search
+from hw3 import goal_test, next_moves, h905751487, buildLevelTables
+
+YIELD_EVERY = 64
+
+
+async def solve(level, heuristic=h905751487, yield_every=YIELD_EVERY, timeout=None, executor=None,
+                max_expanded=None):
+    """
+    :param level: the start state (list of lists or numpy array)
+    :param heuristic: the heuristic function (module-level when an executor is used)
+    :param yield_every: expansions between two yields to the event loop
+    :param timeout: seconds before the solve is cancelled (raises asyncio.TimeoutError)
+    :param executor: optional concurrent.futures executor to run the search in
+    :param max_expanded: expansion budget; a 'budget' result is returned when it runs out
+    :return: a batch.BatchResult with index None
+    """
+    loop = asyncio.get_running_loop()
+    if executor is not None:
+        result = await loop.run_in_executor(executor, batch.solve_one, None, level, heuristic, max_expanded,
+                                            timeout)
+        if result.status == 'timeout':
+            raise asyncio.TimeoutError(result.error)
+        return result
+    return await asyncio.wait_for(solve_here(loop, level, heuristic, yield_every, max_expanded), timeout)
+
+
+async def solve_here(loop, level, heuristic, yield_every, max_expanded):
+    start = time.perf_counter()
+    state = np.array(level)
+    if heuristic is h905751487:
+        key = hw3.levelKey(state)
+        if hw3.cacheGet(hw3.levelCache, key) is None:
+            tables = await loop.run_in_executor(None, buildLevelTables, state)
+            hw3.cachePut(hw3.levelCache, key, tables, hw3.LEVEL_CACHE_SIZE)
+    steps = search.iter_a_star_search(state, goal_test, None, heuristic, max_expanded=max_expanded,
+                                      yield_every=yield_every, next_moves=next_moves)
+    try:
+        while True:
+            next(steps)
+            await asyncio.sleep(0)
+    except StopIteration as stop:
+        node, generated, expanded = stop.value
+    except search.BudgetExceeded as e:
+        return batch.BatchResult(None, 'budget', None, None, e.node_generated, e.node_expanded,
+                                 time.perf_counter() - start, str(e))
+    finally:
+        steps.close()
+    return batch.search_result(None, state, node, generated, expanded, time.perf_counter() - start)
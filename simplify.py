@@ -0,0 +1,113 @@
+"""Level simplification before search.
+
+simplify() shrinks a level without changing which moves are possible:
+
+* cells the keeper can never reach are turned into walls,
+* boxes sitting on goals in a corner (they can never be pushed again) are
+  turned into walls together with their goal,
+* the grid is cropped to the bounding box of the remaining open cells.
+
+Off-grid squares already behave like walls in try_move, so no border is
+kept around the cropped grid. SimplifiedLevel.expand maps states of the
+simplified level back onto the original grid.
+"""
+
+import numpy as np
+
+from hw3 import wall, box, boxstar, getKeeperPosition
+
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class Unsolvable(ValueError):
+    pass
+
+
+def is_wall_at(s, r, c):
+    return r < 0 or c < 0 or r >= s.shape[0] or c >= s.shape[1] or s[r, c] == wall
+
+
+def keeper_region(s):
+    """
+    :param s: a state (numpy array)
+    :return: boolean mask of the cells connected to the keeper through non-wall cells
+    """
+    region = np.zeros(s.shape, dtype=bool)
+    stack = [getKeeperPosition(s)]
+    region[stack[0]] = True
+    while stack:
+        r, c = stack.pop()
+        for dr, dc in STEPS:
+            nr, nc = r + dr, c + dc
+            if not is_wall_at(s, nr, nc) and not region[nr, nc]:
+                region[nr, nc] = True
+                stack.append((nr, nc))
+    return region
+
+
+def is_cornered(s, r, c):
+    vertical = is_wall_at(s, r - 1, c) or is_wall_at(s, r + 1, c)
+    horizontal = is_wall_at(s, r, c - 1) or is_wall_at(s, r, c + 1)
+    return vertical and horizontal
+
+
+class SimplifiedLevel:
+    def __init__(self, original, state, offset, changed, frozen):
+        """
+
+        :param original: the start state as given
+        :param state: the simplified start state
+        :param offset: (row, col) of the simplified grid's top-left cell in the original grid
+        :param changed: mask over the simplified grid of cells that were turned into walls
+        :param frozen: original coordinates of the boxes that were frozen into walls
+        """
+        self.original = original
+        self.state = state
+        self.offset = offset
+        self.changed = changed
+        self.frozen = frozen
+
+    def expand(self, s):
+        """
+        :param s: a state of the simplified level
+        :return: the same state on the original grid
+        """
+        r0, c0 = self.offset
+        rows, cols = self.state.shape
+        full = np.copy(self.original)
+        window = full[r0:r0 + rows, c0:c0 + cols]
+        window[~self.changed] = s[~self.changed]
+        return full
+
+    def expand_path(self, path):
+        return [self.expand(s) for s in path]
+
+
+def simplify(s):
+    """
+    :param s: the start state (list of lists or numpy array)
+    :return: a SimplifiedLevel
+    :raises Unsolvable: if a box off goal lies outside the keeper's region (a ValueError)
+    """
+    original = np.array(s)
+    work = np.copy(original)
+    frozen = []
+    while True:
+        region = keeper_region(work)
+        outside = ~region & (work != wall)
+        if np.any(outside & (work == box)):
+            raise Unsolvable('level is unsolvable: a box lies outside the keeper region')
+        work[outside] = wall
+        cornered = [(r, c) for r, c in zip(*np.nonzero(work == boxstar)) if is_cornered(work, r, c)]
+        if not cornered:
+            break
+        for r, c in cornered:
+            work[r, c] = wall
+            frozen.append((int(r), int(c)))
+
+    rows, cols = np.nonzero(work != wall)
+    r0, r1 = rows.min(), rows.max() + 1
+    c0, c1 = cols.min(), cols.max() + 1
+    state = np.copy(work[r0:r1, c0:c1])
+    changed = state != original[r0:r1, c0:c1]
+    return SimplifiedLevel(original, state, (int(r0), int(c0)), changed, frozen)
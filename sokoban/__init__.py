@@ -0,0 +1,53 @@
+"""Lazily loaded entry point to the solver.
+
+This package only re-exports names; the code itself stays in the
+top-level modules (hw3, search, levels, corpus).
+
+Importing this package loads nothing else: each name below is imported
+from the module that defines it the first time it is used, so processes
+that only need part of the solver (or none of it, like a pool worker
+that is handed a pickled function) do not pay for the rest.
+
+* state model: goal_test, next_states, next_moves, replayMoves (hw3)
+* heuristics: h0, h1, h905751487 (hw3)
+* engine: solve, SolveResult (hw3), a_star_search, ida_star_search,
+  BudgetExceeded, TimeBudgetExceeded (search)
+* level registry: builtin, iter_xsb, read_xsb (levels), Corpus (corpus)
+"""
+
+import importlib
+
+EXPORTS = {
+    'goal_test': 'hw3',
+    'next_states': 'hw3',
+    'next_moves': 'hw3',
+    'replayMoves': 'hw3',
+    'h0': 'hw3',
+    'h1': 'hw3',
+    'h905751487': 'hw3',
+    'solve': 'hw3',
+    'SolveResult': 'hw3',
+    'a_star_search': 'search',
+    'ida_star_search': 'search',
+    'BudgetExceeded': 'search',
+    'TimeBudgetExceeded': 'search',
+    'builtin': 'levels',
+    'iter_xsb': 'levels',
+    'read_xsb': 'levels',
+    'Corpus': 'corpus',
+}
+
+__all__ = sorted(EXPORTS)
+
+
+def __getattr__(name):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return __all__
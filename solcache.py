@@ -0,0 +1,153 @@
+"""Persistent cache of solved levels.
+
+SolutionCache maps a canonical level fingerprint to a solution move string
+and the stats of the search that found it, in an SQLite file. The
+fingerprint is computed from the simplified level (see simplify: cells the
+keeper cannot reach and frozen boxes become walls, the grid is cropped),
+taking the smallest of its eight images under the rotations and
+reflections in symmetry.TRANSFORMS. A level that differs only in
+decoration, position or orientation therefore hits the same entry.
+
+Moves are stored in the frame of the canonical image and mapped through
+the transforms on the way in and out. Simplification never changes which
+moves are possible, so the mapped moves solve the original level. They
+are still replayed and checked with goal_test before a hit is returned;
+an entry that fails the check is deleted.
+"""
+
+import hashlib
+import sqlite3
+import struct
+import time
+
+import numpy as np
+
+import simplify
+import symmetry
+from hw3 import SolveResult, goal_test, replayMoves
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS solutions (
+    fingerprint TEXT PRIMARY KEY,
+    moves TEXT NOT NULL,
+    optimal INTEGER NOT NULL,
+    generated INTEGER,
+    expanded INTEGER,
+    seconds REAL,
+    created REAL NOT NULL
+)
+'''
+
+
+def direction_map(f):
+    """
+    :param f: a transform from symmetry.TRANSFORMS
+    :return: dict mapping each move letter to the letter of the same move in the transformed frame
+    """
+    mapping = {}
+    for d, dr, dc in (('u', -1, 0), ('d', 1, 0), ('l', 0, -1), ('r', 0, 1)):
+        grid = np.zeros((3, 3), dtype=np.int8)
+        grid[1, 1] = 1
+        grid[1 + dr, 1 + dc] = 2
+        image = f(grid)
+        (r0, c0), (r1, c1) = np.argwhere(image == 1)[0], np.argwhere(image == 2)[0]
+        step = (r1 - r0, c1 - c0)
+        mapping[d] = {(-1, 0): 'u', (1, 0): 'd', (0, -1): 'l', (0, 1): 'r'}[step]
+        mapping[d.upper()] = mapping[d].upper()
+    return mapping
+
+
+DIRECTIONS = {name: direction_map(f) for name, f in symmetry.TRANSFORMS.items()}
+
+
+def translate(moves, mapping):
+    return moves.translate(str.maketrans(mapping))
+
+
+def fingerprint(s):
+    """
+    :param s: a start state (list of lists or numpy array)
+    :return: (hex fingerprint, name of the transform that takes the simplified level to its canonical image)
+    :raises simplify.Unsolvable: if simplify finds the level unsolvable
+    """
+    state = simplify.simplify(s).state.astype(np.uint8)
+    best = None
+    for name, f in symmetry.TRANSFORMS.items():
+        image = f(state)
+        candidate = (image.shape, image.tobytes())
+        if best is None or candidate < best[0]:
+            best = (candidate, name)
+    (shape, cells), name = best
+    digest = hashlib.blake2b(cells + struct.pack('<2q', *shape), digest_size=16).hexdigest()
+    return digest, name
+
+
+class SolutionCache:
+    def __init__(self, path):
+        """
+        :param path: the SQLite file (created if missing)
+        """
+        self.db = sqlite3.connect(path)
+        self.db.execute(SCHEMA)
+        self.db.commit()
+
+    def get(self, s, optimal=True):
+        """
+        :param s: a start state
+        :param optimal: only return solutions stored as optimal
+        :return: a verified SolveResult in the frame of s (with the stats of the original search), or None
+        """
+        try:
+            key, name = fingerprint(s)
+        except simplify.Unsolvable:
+            return None
+        row = self.db.execute('SELECT moves, optimal, generated, expanded, seconds FROM solutions '
+                              'WHERE fingerprint = ?', (key,)).fetchone()
+        if row is None or (optimal and not row[1]):
+            return None
+        canonical, _, generated, expanded, seconds = row
+        inverse = {v: k for k, v in DIRECTIONS[name].items()}
+        moves = translate(canonical, inverse)
+        start = np.array(s)
+        try:
+            valid = goal_test(replayMoves(start, moves)[-1])
+        except ValueError:
+            valid = False
+        if not valid:
+            self.db.execute('DELETE FROM solutions WHERE fingerprint = ?', (key,))
+            self.db.commit()
+            return None
+        return SolveResult(moves, len(moves), generated, expanded, seconds, start)
+
+    def put(self, s, result, optimal=True):
+        """
+        Store result (a SolveResult for start state s), replacing any entry of the same level
+        unless that one is optimal and result is not.
+
+        :return: True if the entry was written
+        """
+        try:
+            key, name = fingerprint(s)
+        except simplify.Unsolvable:
+            return False
+        if not optimal:
+            row = self.db.execute('SELECT optimal FROM solutions WHERE fingerprint = ?', (key,)).fetchone()
+            if row is not None and row[0]:
+                return False
+        self.db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (key, translate(result.moves, DIRECTIONS[name]), int(optimal), result.generated,
+                         result.expanded, result.seconds, time.time()))
+        self.db.commit()
+        return True
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
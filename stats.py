@@ -0,0 +1,159 @@
+"""Search-shape statistics.
+
+SearchStats subscribes to the search events (search.Hooks) of one solve
+and records:
+
+* every sample_every expansions (and once more at the goal): the f- and
+  g-value histograms of the open list, the frontier and closed-set sizes
+  and the duplicate-hit rate (the share of nodes taken off the open list
+  that were already closed; the goal itself is not counted);
+* at the goal: the depth, the effective branching factor b* (a uniform
+  tree of that depth with branching factor b* has as many nodes as were
+  generated), and the heuristic error h* - h along the solution path. h is
+  read back from each node's evaluation (f - g, so it includes the weight of
+  weighted A*).
+
+to_json() writes the summary and all samples; to_csv() writes one row per
+sample, with the histograms as 'value:count' lists.
+
+    collector = stats.SearchStats(sample_every=500)
+    search.a_star_search(s, goal_test, next_states, h1, hooks=collector.hooks())
+    collector.to_csv('s7-h1.csv')
+"""
+
+import csv
+import json
+import time
+from collections import Counter
+
+import search
+
+SAMPLE_EVERY = 1000
+FIELDS = ['expanded', 'generated', 'seconds', 'frontier', 'closed', 'duplicate_rate', 'f_min', 'f_max',
+          'f_histogram', 'g_histogram']
+
+
+def branching_factor(generated, depth, tolerance=1e-6):
+    """
+    :return: b such that 1 + b + ... + b**depth == generated (found by bisection), or None for depth 0
+    """
+    if depth == 0:
+        return None
+
+    def nodes(b):
+        total, power = 0.0, 1.0
+        for _ in range(depth + 1):
+            total += power
+            if total >= generated:
+                break
+            power *= b
+        return total
+
+    # b ** depth <= generated, so this bounds b without overflowing any power below it.
+    low, high = 0.0, max(1.0, generated ** (1.0 / depth))
+    while high - low > tolerance:
+        middle = (low + high) / 2
+        if nodes(middle) < generated:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def duplicate_rate(popped, expanded):
+    """
+    :param popped: nodes taken off the open list, not counting a goal
+    :param expanded: nodes expanded
+    :return: the share of popped nodes that were skipped as already closed
+    """
+    return (popped - expanded) / popped if popped else 0.0
+
+
+class SearchStats:
+    def __init__(self, sample_every=SAMPLE_EVERY):
+        """
+        :param sample_every: expansions between two samples of the open list
+        """
+        self.sample_every = sample_every
+        self.samples = []
+        self.summary = None
+        self.started = time.perf_counter()
+
+    def hooks(self):
+        """
+        :return: a search.Hooks feeding this collector; pass it as hooks= to the search
+        """
+        hooks = search.Hooks(sample_every=self.sample_every)
+        hooks.subscribe(self)
+        self.started = time.perf_counter()
+        return hooks
+
+    def on_sample(self, open_list, closed, generated, expanded):
+        f = Counter(node.evaluation for node in open_list)
+        g = Counter(node.cost for node in open_list)
+        popped = generated - len(open_list)
+        self.samples.append({
+            'expanded': expanded,
+            'generated': generated,
+            'seconds': time.perf_counter() - self.started,
+            'frontier': len(open_list),
+            'closed': len(closed),
+            'duplicate_rate': duplicate_rate(popped, expanded),
+            'f_min': min(f) if f else None,
+            'f_max': max(f) if f else None,
+            'f_histogram': dict(sorted(f.items())),
+            'g_histogram': dict(sorted(g.items())),
+        })
+
+    def on_goal(self, node, generated, expanded):
+        path = []
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        path.reverse()
+        depth = len(path) - 1
+        errors = []
+        for n in path:
+            h = n.evaluation - n.cost
+            errors.append({'g': n.cost, 'h': h, 'remaining': depth - n.cost, 'error': depth - n.cost - h})
+        last = self.samples[-1] if self.samples else {}
+        if last:
+            # The last sample was taken with the goal already off the open list; the goal was neither
+            # expanded nor a duplicate.
+            popped = last['generated'] - last['frontier'] - 1
+            last['duplicate_rate'] = duplicate_rate(popped, last['expanded'])
+        self.summary = {
+            'depth': depth,
+            'generated': generated,
+            'expanded': expanded,
+            'seconds': time.perf_counter() - self.started,
+            'branching_factor': branching_factor(generated, depth),
+            'duplicate_rate': last.get('duplicate_rate'),
+            'heuristic_error_mean': sum(e['error'] for e in errors) / len(errors),
+            'heuristic_error_max': max(e['error'] for e in errors),
+            'heuristic_error': errors,
+        }
+
+    def to_json(self, file):
+        """
+        :param file: a path or a text stream
+        """
+        if isinstance(file, str):
+            with open(file, 'w') as f:
+                return self.to_json(f)
+        json.dump({'summary': self.summary, 'samples': self.samples}, file, indent=1)
+
+    def to_csv(self, file):
+        """
+        :param file: a path or a text stream
+        """
+        if isinstance(file, str):
+            with open(file, 'w', newline='') as f:
+                return self.to_csv(f)
+        writer = csv.DictWriter(file, FIELDS)
+        writer.writeheader()
+        for sample in self.samples:
+            row = dict(sample)
+            for name in ('f_histogram', 'g_histogram'):
+                row[name] = ' '.join('{}:{}'.format(value, count) for value, count in sample[name].items())
+            writer.writerow(row)
@@ -0,0 +1,84 @@
+"""Board symmetries and symmetry-aware closed-set keys.
+
+A symmetry of a level is a rotation or reflection of the grid that maps
+walls onto walls and goals onto goals. Two states related by such a
+transform have the same cost to the goal, so the search only needs to
+expand one of them.
+"""
+
+import numpy as np
+
+import search
+
+from hw3 import wall, star, boxstar, keeperstar
+
+# The eight elements of the dihedral group of the square, acting on 2D arrays.
+# Rotations by a quarter turn and the diagonal reflections only preserve the
+# board when it is square.
+TRANSFORMS = {
+    'identity': lambda a: a,
+    'rot90': lambda a: np.rot90(a, 1),
+    'rot180': lambda a: np.rot90(a, 2),
+    'rot270': lambda a: np.rot90(a, 3),
+    'flipud': np.flipud,
+    'fliplr': np.fliplr,
+    'transpose': np.transpose,
+    'antitranspose': lambda a: np.rot90(a, 2).T,
+}
+
+
+def layout(s):
+    """
+    :param s: a state (numpy array)
+    :return: array with 1 on walls, 2 on goals and 0 elsewhere
+    """
+    s = np.asarray(s)
+    goals = (s == star) | (s == boxstar) | (s == keeperstar)
+    return np.where(s == wall, 1, np.where(goals, 2, 0))
+
+
+def symmetry_group(s):
+    """
+    :param s: any state of the level
+    :return: names of the transforms in TRANSFORMS that leave the walls and goals of s unchanged
+    """
+    board = layout(s)
+    return [name for name, f in TRANSFORMS.items()
+            if f(board).shape == board.shape and np.array_equal(f(board), board)]
+
+
+def canonical_key(group):
+    """
+    :param group: transform names, as returned by symmetry_group
+    :return: a state_key function for search.a_star_search that maps every state to the
+             smallest byte string among its images under the group
+    """
+    transforms = [TRANSFORMS[name] for name in group if name != 'identity']
+    if not transforms:
+        return None
+
+    def key(s):
+        best = s.tobytes()
+        for f in transforms:
+            k = f(s).tobytes()
+            if k < best:
+                best = k
+        return best
+
+    return key
+
+
+def symmetry_key(s):
+    """
+    :param s: the start state
+    :return: a canonicalizing state_key for the level of s, or None if the level has no symmetry
+    """
+    return canonical_key(symmetry_group(s))
+
+
+def a_star_search(start_state, goal_test, next_states, heuristic):
+    """
+    search.a_star_search with the closed set keyed on canonical states of the level's symmetry group.
+    """
+    return search.a_star_search(start_state, goal_test, next_states, heuristic,
+                                state_key=symmetry_key(start_state))
@@ -16,17 +16,51 @@ The other test cases are invented.
 #       expected to expand >= 10000 nodes, so they can take a long time
 #       to complete without a good heuristic.
 
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import queue
 import re
+import subprocess
 import sys
+import tempfile
+import threading
+import time
 import unittest
 from argparse import ArgumentParser
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Callable, Iterable, Optional, Type
+from unittest import mock
 
 import numpy as np
 import numpy.typing as npt
 
+import artifacts
 import astar
+import batch
+import bench
+import checkpoint
+import closedset
+import corpus
+import external
+import generate
+import hda
+import hotpath
 import hw3
+import levels
+import perimeter
+import portfolio
+import render
+import search
+import service
+import simplify
+import solcache
+import stats
+import symmetry
 from hw3 import goal_test, h0, h1, next_states
 
 State = npt.NDArray[np.int_]
@@ -223,6 +257,107 @@ S19 = [[0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
        [0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
        [0, 0, 0, 1, 0, 2, 0, 4, 1, 0, 0, 0]]
 
+# Documented [nodes expanded using h0, depth of optimal solution] of
+# each problem, from the comments above (None where they say "??").
+SOKOBAN_PROBLEMS: dict[str, tuple[list[list[int]], Optional[int], int]] = {
+    "s1": (S1, 80, 7),
+    "s2": (S2, 110, 10),
+    "s3": (S3, 211, 12),
+    "s4": (S4, 300, 13),
+    "s5": (S5, 551, 10),
+    "s6": (S6, 722, 12),
+    "s7": (S7, 1738, 50),
+    "s8": (S8, 1763, 22),
+    "s9": (S9, 1806, 41),
+    "s10": (S10, 10082, 51),
+    "s11": (S11, 16517, 48),
+    "s12": (S12, 22035, 38),
+    "s13": (S13, 26905, 28),
+    "s14": (S14, 41715, 53),
+    "s15": (S15, 48695, 44),
+    "s16": (S16, 91344, 111),
+    "s17": (S17, 3301278, 76),
+    "s18": (S18, None, 25),
+    "s19": (S19, None, 21),
+}
+SIMPLE_SOKOBAN = [f"s{i}" for i in range(1, 10)]
+EXTREME_SOKOBAN = [f"s{i}" for i in range(10, 20)]
+
+# endregion
+# ==================================================================== #
+# region Test Helpers
+
+
+def _get_depth_of_solution(goal_node: Optional[astar.PathNode]) -> int:
+    """
+    Get the depth of the search tree solution whose path terminates at
+    the given node.
+    Logic abridged from the `a_star` function of the skeleton code.
+    """
+    if goal_node is None:
+        raise ValueError(f"{goal_node=} should not have been None")
+    node = goal_node
+    path_length = 1
+    while node.parent:
+        node = node.parent
+        path_length += 1
+    depth = path_length - 1
+    return depth
+
+
+def _get_goal_node(
+    start_state: list[list[int]],
+    heuristic: HeuristicFunction,
+) -> Optional[astar.PathNode]:
+    """Wrapper for calling the provided `astar` module's search API."""
+    goal_node, *_ = astar.a_star_search(
+        np.array(start_state),
+        goal_test,
+        next_states,
+        heuristic,
+    )
+    return goal_node
+
+
+def _h1_or_raise_on_wide_levels(s: State) -> int:
+    """Heuristic that raises in its worker process on levels wider than 8."""
+    if s.shape[1] > 8:
+        raise ValueError("too wide")
+    return h1(s)
+
+
+def _h1_or_crash_on_wide_levels(s: State) -> int:
+    """Heuristic that kills its worker process on levels wider than 8."""
+    if s.shape[1] > 8:
+        os._exit(1)
+    return h1(s)
+
+
+def _uses_shared_tables(tables: dict, key: str) -> bool:
+    """Whether the cached level tables are views into the segment of key."""
+    artifacts.attach(key)
+    buf = np.frombuffer(artifacts.attached[key][0].buf, dtype=np.uint8)
+    arrays = [tables["open"], tables["dead"], *tables["goalDist"],
+              *tables["escape"].values()]
+    return all(isinstance(a, np.ndarray) and np.shares_memory(a, buf)
+               for a in arrays)
+
+
+_batch_solve_one = batch.solve_one
+
+
+def _solve_one_on_shared_tables(index, level, heuristic, max_expanded=None,
+                                time_limit=None, tables_key=None):
+    """batch.solve_one that fails if the worker rebuilds or copies the tables."""
+    with mock.patch.object(hw3, "pullDistances", side_effect=AssertionError("rebuilt")):
+        result = _batch_solve_one(index, level, heuristic, max_expanded,
+                                  time_limit, tables_key)
+    tables = hw3.levelCache[hw3.levelKey(np.array(level))]
+    if not _uses_shared_tables(tables, tables_key):
+        return result._replace(status="copied")
+    return result
+
+
 # endregion
 # ==================================================================== #
 # region Test Suites
@@ -544,35 +679,1024 @@ class TestH1(unittest.TestCase):
         self.assertEqual(h1(s17), 5)
 
 
-def _get_depth_of_solution(goal_node: Optional[astar.PathNode]) -> int:
-    """
-    Get the depth of the search tree solution whose path terminates at
-    the given node.
-    Logic abridged from the `a_star` function of the skeleton code.
-    """
-    if goal_node is None:
-        raise ValueError(f"{goal_node=} should not have been None")
-    node = goal_node
-    path_length = 1
-    while node.parent:
-        node = node.parent
-        path_length += 1
-    depth = path_length - 1
-    return depth
-
+class TestHUID(unittest.TestCase):
+    def test_return_zero_for_goal_state(self) -> None:
+        goal_state = np.array([[1, 1, 1, 1, 1, 1],
+                               [1, 0, 0, 0, 0, 1],
+                               [1, 0, 0, 3, 5, 1],
+                               [1, 1, 1, 1, 1, 1]])
+        self.assertEqual(hUID(goal_state), 0)
+
+    def test_never_exceeds_optimal_depth(self) -> None:
+        for start_state, depth in [(S1, 7), (S2, 10), (S3, 12), (S4, 13),
+                                   (S5, 10), (S6, 12), (S7, 50), (S8, 22),
+                                   (S9, 41), (S16, 111), (S17, 76)]:
+            self.assertLessEqual(hUID(np.array(start_state)), depth)
+
+    def test_box_in_corner_is_deadlock(self) -> None:
+        state = np.array([[1, 1, 1, 1, 1],
+                          [1, 2, 0, 0, 1],
+                          [1, 0, 3, 4, 1],
+                          [1, 1, 1, 1, 1]])
+        self.assertGreaterEqual(hUID(state), hw3.DEADLOCK)
+
+    def test_frozen_pair_against_wall_is_deadlock(self) -> None:
+        # Neither box is on a dead square by itself, but the two of them
+        # pin each other against the top wall.
+        state = np.array([[1, 1, 1, 1, 1, 1],
+                          [1, 0, 2, 2, 4, 1],
+                          [1, 0, 0, 3, 4, 1],
+                          [1, 0, 0, 0, 0, 1],
+                          [1, 1, 1, 1, 1, 1]])
+        self.assertGreaterEqual(hUID(state), hw3.DEADLOCK)
+        state[1, 3] = 0
+        state[2, 2] = 2
+        self.assertLess(hUID(state), hw3.DEADLOCK)
+
+    def test_consistent_on_corridor_level(self) -> None:
+        # S10 has goals in corridors; check every move of every reachable state.
+        start = np.array(S10)
+        seen = {start.tobytes()}
+        frontier = [start]
+        while frontier:
+            s = frontier.pop()
+            h = hUID(s)
+            if h >= hw3.DEADLOCK:
+                continue
+            for s1 in next_states(s):
+                self.assertLessEqual(h - hUID(s1), 1)
+                if s1.tobytes() not in seen:
+                    seen.add(s1.tobytes())
+                    frontier.append(s1)
+
+    def test_caches_are_bounded(self) -> None:
+        with mock.patch.object(hw3, "levelCache", OrderedDict()), \
+                mock.patch.object(hw3, "LEVEL_CACHE_SIZE", 2), \
+                mock.patch.object(hw3, "BOX_CACHE_SIZE", 8):
+            for start_state in (S1, S5, S8):
+                for s in next_states(np.array(start_state)):
+                    for s1 in next_states(s):
+                        hUID(s1)
+            self.assertEqual(len(hw3.levelCache), 2)
+            for tables in hw3.levelCache.values():
+                self.assertLessEqual(len(tables["boxCache"]), 8)
+            self.assertEqual(hUID(np.array(S8)), hUID(np.array(S8)))
+
+
+class TestSearch(unittest.TestCase):
+    def test_same_counts_as_astar(self) -> None:
+        for start_state in (S1, S5, S9):
+            start = np.array(start_state)
+            expected = astar.a_star_search(start, goal_test, next_states, h1)
+            received = search.a_star_search(start, goal_test, next_states, h1)
+            self.assertEqual(received[0].cost, expected[0].cost)
+            self.assertEqual(received[1:], expected[1:])
+
+    def test_return_none_when_unsolvable(self) -> None:
+        start = np.array([[1, 1, 1, 1],
+                          [1, 3, 2, 1],
+                          [1, 1, 4, 1],
+                          [1, 1, 1, 1]])
+        goal_node, *_ = search.a_star_search(start, goal_test, next_states, h0)
+        self.assertIsNone(goal_node)
+
+    def test_raise_when_budget_exhausted(self) -> None:
+        with self.assertRaises(search.BudgetExceeded) as cm:
+            search.a_star_search(np.array(S9), goal_test, next_states, h0,
+                                 max_expanded=100)
+        self.assertEqual(cm.exception.node_expanded, 100)
+
+    def test_ida_star_finds_optimal_depth(self) -> None:
+        for start_state, depth in [(S1, 7), (S5, 10), (S8, 22)]:
+            goal_node, _, _ = search.ida_star_search(
+                np.array(start_state), goal_test, next_states, h1)
+            self.assertEqual(_get_depth_of_solution(goal_node), depth)
+
+    def test_weighted_a_star_expands_fewer_nodes(self) -> None:
+        start = np.array(S9)
+        _, _, plain = search.a_star_search(start, goal_test, next_states, h1)
+        goal_node, _, weighted = search.a_star_search(
+            start, goal_test, next_states, h1, weight=3)
+        self.assertTrue(goal_test(goal_node.state1))
+        self.assertLess(weighted, plain)
+
+    def test_partial_expansion_stores_fewer_nodes(self) -> None:
+        for start_state, depth in [(S1, 7), (S5, 10), (S8, 22), (S9, 41)]:
+            start = np.array(start_state)
+            _, generated, _ = search.a_star_search(
+                start, goal_test, next_states, h1)
+            goal_node, stored, _ = search.partial_expansion_a_star_search(
+                start, goal_test, next_states, h1)
+            self.assertEqual(_get_depth_of_solution(goal_node), depth)
+            self.assertLess(stored, generated)
+
+
+class TestSymmetry(unittest.TestCase):
+    MIRRORED = [[1, 1, 1, 1, 1, 1, 1],
+                [1, 4, 0, 0, 0, 4, 1],
+                [1, 0, 2, 3, 2, 0, 1],
+                [1, 0, 0, 0, 0, 0, 1],
+                [1, 1, 1, 1, 1, 1, 1]]
+
+    def test_detect_mirror_symmetry(self) -> None:
+        group = symmetry.symmetry_group(np.array(self.MIRRORED))
+        self.assertEqual(group, ["identity", "fliplr"])
+
+    def test_asymmetric_level_has_no_key(self) -> None:
+        self.assertEqual(symmetry.symmetry_group(np.array(S17)), ["identity"])
+        self.assertIsNone(symmetry.symmetry_key(np.array(S17)))
+
+    def test_mirror_images_share_a_key(self) -> None:
+        start = np.array(self.MIRRORED)
+        key = symmetry.symmetry_key(start)
+        state = next_states(start)[0]
+        self.assertEqual(key(state), key(np.fliplr(state)))
+        self.assertNotEqual(key(start), key(state))
+
+    def test_fewer_expansions_with_same_depth(self) -> None:
+        start = np.array(self.MIRRORED)
+        plain = search.a_star_search(start, goal_test, next_states, h0)
+        pruned = symmetry.a_star_search(start, goal_test, next_states, h0)
+        self.assertEqual(_get_depth_of_solution(pruned[0]), 10)
+        self.assertEqual(_get_depth_of_solution(plain[0]), 10)
+        self.assertLess(pruned[2], plain[2])
+
+
+class TestSimplify(unittest.TestCase):
+    def test_crop_to_open_cells(self) -> None:
+        level = simplify.simplify(S1)
+        self.assertEqual(level.state.shape, (5, 4))
+        self.assertEqual(level.offset, (1, 1))
+
+    def test_unreachable_cells_become_walls(self) -> None:
+        level = simplify.simplify(S18)
+        self.assertEqual(level.state[0, 0], hw3.wall)
+        self.assertEqual(level.state[5, 0], hw3.blank)
+
+    def test_freeze_box_on_goal_in_corner(self) -> None:
+        level = simplify.simplify([[1, 1, 1, 1, 1],
+                                   [1, 5, 0, 0, 1],
+                                   [1, 0, 2, 3, 1],
+                                   [1, 0, 0, 4, 1],
+                                   [1, 1, 1, 1, 1]])
+        self.assertEqual(level.frozen, [(1, 1)])
+        np.testing.assert_array_equal(level.state, [[1, 0, 0],
+                                                    [0, 2, 3],
+                                                    [0, 0, 4]])
+
+    def test_reject_box_outside_keeper_region(self) -> None:
+        with self.assertRaises(ValueError):
+            simplify.simplify([[3, 0, 1, 2, 0],
+                               [0, 4, 1, 0, 0]])
+
+    def test_path_maps_back_to_original(self) -> None:
+        level = simplify.simplify(S4)
+        goal_node, *_ = search.a_star_search(
+            level.state, goal_test, next_states, h1)
+        path = [goal_node.state1]
+        while goal_node.parent:
+            goal_node = goal_node.parent
+            path.append(goal_node.state1)
+        path = level.expand_path(path[::-1])
+        self.assertEqual(len(path) - 1, 13)
+        np.testing.assert_array_equal(path[0], S4)
+        self.assertTrue(goal_test(path[-1]))
+        for s, s1 in zip(path, path[1:]):
+            self.assertTrue(
+                any(np.array_equal(s1, n) for n in next_states(s)))
+
+
+class TestPerimeter(unittest.TestCase):
+    def test_exact_inside_and_bounded_outside(self) -> None:
+        start = np.array(S1)
+        table = perimeter.Perimeter(start, depth=3, heuristic=h1)
+        goal_state = np.array(S1)
+        goal_state[2, 2], goal_state[5, 4] = 0, 5
+        self.assertEqual(table.heuristic(goal_state), 0)
+        self.assertTrue(table.goal_test(goal_state))
+        self.assertEqual(table.heuristic(start), 4)
+        self.assertFalse(table.goal_test(start))
+
+    def test_optimal_depth_with_fewer_expansions(self) -> None:
+        for start_state, depth in [(S5, 10), (S8, 22), (S9, 41)]:
+            start = np.array(start_state)
+            _, _, plain = search.a_star_search(start, goal_test, next_states, h1)
+            goal_node, _, expanded = perimeter.a_star_search(
+                start, goal_test, next_states, h1, depth=8)
+            self.assertEqual(_get_depth_of_solution(goal_node), depth)
+            self.assertTrue(goal_test(goal_node.state1))
+            self.assertLess(expanded, plain)
+
+    def test_boxes_walled_off_from_keeper(self) -> None:
+        start = np.array([[1, 1, 1, 1, 1, 1, 1, 1, 1],
+                          [1, 5, 1, 3, 0, 2, 0, 4, 1],
+                          [1, 1, 1, 1, 1, 1, 1, 1, 1]])
+        goal_node, *_ = perimeter.a_star_search(
+            start, goal_test, next_states, h1, depth=2)
+        self.assertEqual(_get_depth_of_solution(goal_node), 3)
+        self.assertTrue(goal_test(goal_node.state1))
+        start[1, 1] = 2
+        self.assertEqual(perimeter.Perimeter(start).table, {})
+        goal_node, *_ = perimeter.a_star_search(
+            start, goal_test, next_states, h1, depth=2)
+        self.assertIsNone(goal_node)
+
+
+class TestBatch(unittest.TestCase):
+    def test_solve_all_levels(self) -> None:
+        results = list(batch.solve_many([S1, S2, S8], h1, workers=2))
+        self.assertEqual(sorted(r.index for r in results), [0, 1, 2])
+        depths = {r.index: r.depth for r in results}
+        self.assertEqual(depths, {0: 7, 1: 10, 2: 22})
+        for r in results:
+            self.assertEqual(r.status, "solved")
+            self.assertEqual(len(r.solution.moves), r.depth)
+            self.assertTrue(goal_test(r.solution.states()[-1]))
+
+    def test_solutions_are_moves(self) -> None:
+        result = batch.solve_one(0, S8, h1)
+        self.assertIsInstance(result.solution, hw3.SolveResult)
+        self.assertEqual(result.solution.moves, hw3.solve(S8, h1).moves)
+
+    def test_budget_is_per_level(self) -> None:
+        results = list(batch.solve_many([S1, S9], h0, workers=2,
+                                        max_expanded=500))
+        status = {r.index: r.status for r in results}
+        self.assertEqual(status, {0: "solved", 1: "budget"})
+
+    def test_time_budget_is_reported_as_timeout(self) -> None:
+        result = batch.solve_one(0, S17, h0, time_limit=0.2)
+        self.assertEqual(result.status, "timeout")
+        self.assertEqual(result.error, "time budget exhausted")
+
+    def test_crashed_worker_does_not_sink_batch(self) -> None:
+        results = list(batch.solve_many(
+            [S1, S3, S2, S8], _h1_or_crash_on_wide_levels, workers=2))
+        status = {r.index: r.status for r in results}
+        self.assertEqual(status, {0: "solved", 1: "crashed",
+                                  2: "solved", 3: "solved"})
+
+
+class TestHDA(unittest.TestCase):
+    def test_optimal_depth_and_valid_path(self) -> None:
+        for start_state, depth in [(S1, 7), (S5, 10), (S8, 22)]:
+            goal_node, _, _ = hda.hda_star_search(
+                np.array(start_state), goal_test, next_states, h1, workers=3)
+            self.assertEqual(_get_depth_of_solution(goal_node), depth)
+            self.assertTrue(goal_test(goal_node.state1))
+            node = goal_node
+            while node.parent:
+                self.assertTrue(any(np.array_equal(node.state1, s)
+                                    for s in next_states(node.parent.state1)))
+                node = node.parent
+            np.testing.assert_array_equal(node.state1, start_state)
+
+    def test_return_none_when_unsolvable(self) -> None:
+        start = np.array([[1, 1, 1, 1],
+                          [1, 3, 2, 1],
+                          [1, 1, 4, 1],
+                          [1, 1, 1, 1]])
+        goal_node, *_ = hda.hda_star_search(
+            start, goal_test, next_states, h0, workers=2)
+        self.assertIsNone(goal_node)
+
+    def test_raise_when_worker_fails(self) -> None:
+        with self.assertRaisesRegex(hda.WorkerError, "ValueError: too wide"):
+            hda.hda_star_search(np.array(S3), goal_test, next_states,
+                                _h1_or_raise_on_wide_levels, workers=2)
+
+    def test_raise_when_worker_dies(self) -> None:
+        with self.assertRaisesRegex(hda.WorkerError, "exited with code 1"):
+            hda.hda_star_search(np.array(S3), goal_test, next_states,
+                                _h1_or_crash_on_wide_levels, workers=2)
+
+
+class TestPortfolio(unittest.TestCase):
+    def test_return_first_optimal_result(self) -> None:
+        result = portfolio.solve_portfolio(S8)
+        self.assertTrue(result.optimal)
+        self.assertEqual(result.depth, 22)
+        self.assertEqual(len(result.solution.moves), 22)
+
+    def test_fall_back_to_suboptimal_result(self) -> None:
+        configs = [
+            portfolio.Config("weighted", search.a_star_search, h1,
+                             {"weight": 3}, False),
+            portfolio.Config("ida_star/h0", search.ida_star_search, h0,
+                             {"max_expanded": 10}, True),
+        ]
+        result = portfolio.solve_portfolio(S9, configs, time_limit=30)
+        self.assertEqual(result.name, "weighted")
+        self.assertFalse(result.optimal)
+        self.assertTrue(goal_test(result.solution.states()[-1]))
+
+
+class TestService(unittest.TestCase):
+    def test_solve_while_other_tasks_run(self) -> None:
+        ticks = []
+
+        async def ticker() -> None:
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def main() -> batch.BatchResult:
+            task = asyncio.create_task(ticker())
+            result = await service.solve(S9, h1, yield_every=16)
+            task.cancel()
+            return result
+
+        result = asyncio.run(main())
+        self.assertEqual(result.depth, 41)
+        self.assertGreater(len(ticks), 10)
+
+    def test_timeout_cancels_search(self) -> None:
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(service.solve(S17, h0, timeout=0.2))
+
+    def test_solve_in_executor(self) -> None:
+        async def main() -> batch.BatchResult:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                return await service.solve(S8, h1, executor=executor)
+
+        self.assertEqual(asyncio.run(main()).depth, 22)
+
+    def test_timeout_in_executor(self) -> None:
+        async def main() -> batch.BatchResult:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                return await service.solve(S17, h0, executor=executor,
+                                           timeout=0.5)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(main())
+
+    def test_budget_in_executor(self) -> None:
+        async def main() -> batch.BatchResult:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                return await service.solve(S17, h0, executor=executor,
+                                           timeout=60, max_expanded=200)
+
+        result = asyncio.run(main())
+        self.assertEqual(result.status, "budget")
+        self.assertEqual(result.expanded, 200)
+
+    def test_tables_built_off_the_loop(self) -> None:
+        built = []
+        cached = []
+
+        def build_level_tables(s: State) -> dict:
+            built.append(threading.get_ident())
+            return hw3.buildLevelTables(s)
+
+        class RecordingCache(OrderedDict):
+            def __setitem__(self, key, value) -> None:
+                cached.append(threading.get_ident())
+                super().__setitem__(key, value)
+
+        with mock.patch.object(service, "buildLevelTables",
+                               build_level_tables), \
+                mock.patch.object(hw3, "levelCache", RecordingCache()):
+            result = asyncio.run(service.solve(S8))
+        self.assertEqual(result.depth, 22)
+        self.assertEqual(len(built), 1)
+        self.assertNotEqual(built[0], threading.get_ident())
+        self.assertEqual(cached, [threading.get_ident()])
+
+
+class TestArtifacts(unittest.TestCase):
+    def test_attach_read_only_views(self) -> None:
+        with artifacts.Registry() as registry:
+            key = registry.publish(S10)
+            self.assertEqual(key, registry.publish(np.array(S10)))
+            tables = artifacts.attach(key)
+            expected = artifacts.build(S10)
+            self.assertEqual(tables.keys(), expected.keys())
+            for name, array in expected.items():
+                np.testing.assert_array_equal(tables[name], array)
+                self.assertFalse(tables[name].flags.writeable)
+
+    def test_level_hash_ignores_boxes_and_keeper(self) -> None:
+        moved = next_states(np.array(S10))[0]
+        self.assertEqual(artifacts.level_hash(S10), artifacts.level_hash(moved))
+        self.assertNotEqual(artifacts.level_hash(S10), artifacts.level_hash(S11))
+
+    def test_workers_solve_with_shared_tables(self) -> None:
+        # Forked workers would otherwise inherit this process's cached tables.
+        with mock.patch.object(hw3, "levelCache", OrderedDict()), \
+                mock.patch.object(batch, "solve_one", _solve_one_on_shared_tables):
+            results = list(batch.solve_many([S10, S15, S10], hUID, workers=2,
+                                            shared_tables=True))
+        self.assertEqual([r.status for r in results], ["solved"] * 3)
+        depths = {r.index: r.depth for r in results}
+        self.assertEqual(depths, {0: 51, 1: 44, 2: 51})
+
+    def test_registries_do_not_collide(self) -> None:
+        with artifacts.Registry() as first, artifacts.Registry() as second:
+            keys = first.publish(S10), second.publish(S10)
+            self.assertNotEqual(*keys)
+            for key in keys:
+                np.testing.assert_array_equal(artifacts.attach(key)["goals"],
+                                              artifacts.build(S10)["goals"])
+
+    def test_install_shared_views(self) -> None:
+        with mock.patch.object(hw3, "levelCache", OrderedDict()):
+            h = hUID(np.array(S10))
+        with artifacts.Registry() as registry, \
+                mock.patch.object(hw3, "levelCache", OrderedDict()):
+            key = registry.publish(S10)
+            artifacts.install(key)
+            (tables,) = hw3.levelCache.values()
+            self.assertTrue(_uses_shared_tables(tables, key))
+            self.assertEqual(hUID(np.array(S10)), h)
+            self.assertIs(type(hUID(np.array(S10))), int)
+
+
+class TestLevels(unittest.TestCase):
+    COLLECTION = """; My collection
+; First
+#######
+#.@ # #
+#$* $ #
+#   $ #
+# ..  #
+#  *  #
+#######
+Title: Level One
+Author: Someone
+
+Comment:
+A board with
+no title line
+Comment-End:
+  #####
+###+$.#
+#######
+"""
 
-def _get_goal_node(
-    start_state: list[list[int]],
-    heuristic: HeuristicFunction,
-) -> Optional[astar.PathNode]:
-    """Wrapper for calling the provided `astar` module's search API."""
-    goal_node, *_ = astar.a_star_search(
-        np.array(start_state),
-        goal_test,
-        next_states,
-        heuristic,
-    )
-    return goal_node
+    def test_read_boards_and_metadata(self) -> None:
+        first, second = levels.read_xsb(io.StringIO(self.COLLECTION))
+        self.assertEqual(first.title, "Level One")
+        self.assertEqual(first.metadata, {"Title": "Level One",
+                                          "Author": "Someone"})
+        self.assertEqual(first.comments, ["; My collection", "; First"])
+        self.assertEqual(first.rows[1], [1, 4, 3, 0, 1, 0, 1])
+        self.assertEqual(first.rows[2], [1, 2, 5, 0, 2, 0, 1])
+        self.assertIsNone(second.title)
+        self.assertEqual(second.comments, ["A board with", "no title line"])
+        self.assertEqual(second.rows, [[0, 0, 1, 1, 1, 1, 1],
+                                       [1, 1, 1, 6, 2, 4, 1],
+                                       [1, 1, 1, 1, 1, 1, 1]])
+
+    def test_round_trip_predefined_problems(self) -> None:
+        text = "".join(levels.format_xsb(state, name)
+                       for name, (state, *_) in SOKOBAN_PROBLEMS.items())
+        for level, (name, (state, *_)) in zip(
+                levels.iter_xsb(io.StringIO(text)), SOKOBAN_PROBLEMS.items()):
+            self.assertEqual(level.title, name)
+            self.assertEqual(level.rows, state)
+
+    def test_stream_levels_lazily(self) -> None:
+        consumed = []
+
+        def lines() -> Iterable[str]:
+            for line in io.StringIO(self.COLLECTION):
+                consumed.append(line)
+                yield line
+
+        first = next(levels.iter_xsb(lines()))
+        self.assertEqual(first.title, "Level One")
+        self.assertLess(len(consumed), self.COLLECTION.count("\n"))
+
+
+class TestCorpus(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "levels.bin")
+
+    def test_random_access(self) -> None:
+        problems = list(SOKOBAN_PROBLEMS.items())
+        written = corpus.write_corpus(
+            self.path,
+            (levels.Level(name, state, [], {}) for name, (state, *_) in problems),
+        )
+        self.assertEqual(written, 19)
+        with corpus.Corpus(self.path) as c:
+            self.assertEqual(len(c), 19)
+            for i in (16, 0, 18, 3, -1):
+                name, (state, *_) = problems[i]
+                np.testing.assert_array_equal(c[i], state)
+                self.assertEqual(c.title(i), name)
+            with self.assertRaises(IndexError):
+                c[19]
+
+    def test_cells_take_three_bits(self) -> None:
+        corpus.write_corpus(self.path, [S18])
+        rows, cols = np.array(S18).shape
+        expected = (corpus.HEADER.size + corpus.RECORD.size
+                    + (3 * rows * cols + 7) // 8 + 8)
+        self.assertEqual(os.path.getsize(self.path), expected)
+
+    def test_convert_xsb(self) -> None:
+        source = io.StringIO(levels.format_xsb(S1, "s1")
+                             + levels.format_xsb(S19, "s19"))
+        self.assertEqual(corpus.convert_xsb(source, self.path), 2)
+        with corpus.Corpus(self.path) as c:
+            np.testing.assert_array_equal(c[1], S19)
+            self.assertEqual(c.title(0), "s1")
+            goal_node, *_ = search.a_star_search(
+                c[0], goal_test, next_states, h1)
+            self.assertEqual(_get_depth_of_solution(goal_node), 7)
+
+
+class TestSolveResult(unittest.TestCase):
+    def test_moves_match_next_states(self) -> None:
+        for state, *_ in SOKOBAN_PROBLEMS.values():
+            state = np.array(state)
+            pairs = hw3.next_moves(state)
+            successors = next_states(state)
+            self.assertEqual(len(pairs), len(successors))
+            for (move, s), s1 in zip(pairs, successors):
+                np.testing.assert_array_equal(s, s1)
+                self.assertEqual(hw3.moveCode(state, s1), move)
+
+    def test_solve_records_moves(self) -> None:
+        for name in ("s1", "s4", "s8"):
+            state, _, depth = SOKOBAN_PROBLEMS[name]
+            result = hw3.solve(state, h1)
+            reference = astar.a_star_search(np.array(state), goal_test, next_states, h1)
+            self.assertEqual(result.depth, depth)
+            self.assertEqual(len(result.moves), depth)
+            self.assertEqual((result.generated, result.expanded), reference[1:])
+            states = result.states()
+            self.assertEqual(len(states), depth + 1)
+            self.assertTrue(goal_test(states[-1]))
+            pushes = sum(
+                1 for s, s1 in zip(states, states[1:])
+                if not np.array_equal(s == 2, s1 == 2) or not np.array_equal(s == 5, s1 == 5))
+            self.assertEqual(pushes, sum(map(str.isupper, result.moves)))
+
+    def test_custom_successors(self) -> None:
+        state, _, depth = SOKOBAN_PROBLEMS["s1"]
+        result = hw3.solve(state, h0, successors=lambda s: next_states(s))
+        self.assertEqual(result.moves, hw3.solve(state, h0).moves)
+        with self.assertRaises(ValueError):
+            hw3.replayMoves(np.array(state), "u" * 20)
+
+    def test_push_and_unsolvable(self) -> None:
+        state = np.array([[1, 1, 1, 1, 1],
+                          [1, 3, 2, 4, 1],
+                          [1, 1, 1, 1, 1]])
+        self.assertEqual(hw3.solve(state, h0).moves, "R")
+        stuck = np.array([[1, 1, 1, 1, 1],
+                          [1, 2, 3, 4, 1],
+                          [1, 1, 1, 1, 1]])
+        self.assertIsNone(hw3.solve(stuck, h0))
+
+
+class TestRender(unittest.TestCase):
+    def test_frame(self) -> None:
+        self.assertEqual(
+            render.frame(S1),
+            "######\n# @  #\n# $  #\n## ###\n#    #\n#   .#\n######")
+
+    def test_replay_redraws_changed_cells_only(self) -> None:
+        states = hw3.solve(S1, h1).states()
+        out = io.StringIO()
+        screen = render.Replay(out)
+        screen.draw(states[0])
+        self.assertTrue(out.getvalue().startswith(render.CLEAR))
+        out.seek(0)
+        out.truncate()
+        screen.draw(states[1])  # a push: keeper, box and the cell the box lands on
+        self.assertEqual(out.getvalue(), "\x1b[2;3H \x1b[3;3H@\x1b[4;3H$\x1b[8;1H")
+
+    def test_export(self) -> None:
+        result = hw3.solve(S1, h1)
+        out = io.StringIO()
+        self.assertEqual(render.export(result.states(), out), result.depth + 1)
+        frames = out.getvalue().split("\n\n")
+        self.assertEqual(frames[0], render.frame(S1))
+        self.assertEqual(len(frames), result.depth + 2)
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "search.ckpt")
+
+    def test_resume_continues_exactly(self) -> None:
+        state = np.array(S7)
+        expected = search.a_star_search(state, goal_test, next_states, h1)
+        with self.assertRaises(search.BudgetExceeded):
+            checkpoint.a_star_search(state, goal_test, next_states, h1, self.path,
+                                     every=500, max_expanded=1200)
+        _, open_list, _, _, expanded = checkpoint.load(self.path)
+        self.assertEqual(expanded, 1000)
+        self.assertTrue(open_list)
+        goal_node, generated, expanded = checkpoint.resume(self.path)
+        self.assertEqual((generated, expanded), expected[1:])
+        self.assertEqual(_get_depth_of_solution(goal_node), _get_depth_of_solution(expected[0]))
+
+    def test_moves_survive_resume(self) -> None:
+        state = np.array(S4)
+        expected = hw3.solve(state, h1)
+        with self.assertRaises(search.BudgetExceeded):
+            checkpoint.a_star_search(state, goal_test, None, h1, self.path, every=50,
+                                     max_expanded=120, next_moves=hw3.next_moves)
+        goal_node, *_ = checkpoint.resume(self.path)
+        self.assertEqual(search.move_string(goal_node), expected.moves)
+
+    def test_empty_frontier(self) -> None:
+        start = np.array([[1, 1, 1, 1, 1, 1],
+                          [1, 3, 1, 2, 4, 1],
+                          [1, 1, 1, 1, 1, 1]])
+        goal_node, *_ = checkpoint.a_star_search(start, goal_test, next_states, h0,
+                                                 self.path, every=1)
+        self.assertIsNone(goal_node)
+        _, open_list, _, _, expanded = checkpoint.load(self.path)
+        self.assertEqual((open_list, expanded), ([], 1))
+        self.assertEqual(checkpoint.resume(self.path), (None, 1, 1))
+
+    def test_rejects_other_versions(self) -> None:
+        with open(self.path, "wb") as f:
+            f.write(checkpoint.MAGIC + bytes([checkpoint.VERSION + 1]))
+        with self.assertRaises(ValueError):
+            checkpoint.resume(self.path)
+
+
+class TestExternal(unittest.TestCase):
+    def test_matches_in_memory_search(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("s10", "s11", "s12", "s13"):
+                state, _, depth = SOKOBAN_PROBLEMS[name]
+                state = np.array(state)
+                goal_node, generated, expanded = external.external_a_star_search(
+                    state, goal_test, next_states, hw3.h905751487,
+                    memory_limit=4096, directory=directory)
+                self.assertEqual(_get_depth_of_solution(goal_node), depth)
+                self.assertTrue(goal_test(goal_node.state1))
+                node = goal_node
+                while node.parent is not None:
+                    self.assertTrue(any(np.array_equal(s, node.state1)
+                                        for s in next_states(node.parent.state1)))
+                    node = node.parent
+                np.testing.assert_array_equal(node.state1, state)
+                self.assertEqual(os.listdir(directory), [])
+
+    def test_unsolvable(self) -> None:
+        stuck = np.array([[1, 1, 1, 1, 1],
+                          [1, 2, 3, 4, 1],
+                          [1, 1, 1, 1, 1]])
+        goal_node, generated, expanded = external.external_a_star_search(
+            stuck, goal_test, next_states, h0)
+        self.assertIsNone(goal_node)
+        self.assertEqual((generated, expanded), (3, 2))
+
+
+class TestClosedSet(unittest.TestCase):
+    def test_mapping(self) -> None:
+        for verify_bytes in (0, 4):
+            closed = closedset.ClosedSet(capacity=4, verify_bytes=verify_bytes)
+            keys = [i.to_bytes(4, "little") for i in range(5000)]
+            for i, key in enumerate(keys):
+                closed[key] = i
+            closed[keys[7]] = 3
+            self.assertEqual(len(closed), 5000)
+            self.assertEqual(closed.get(keys[7]), 3)
+            self.assertEqual(closed[keys[4999]], 4999)
+            self.assertIsNone(closed.get(b"missing"))
+            self.assertNotIn(b"missing", closed)
+            with self.assertRaises(KeyError):
+                closed[b"missing"]
+
+    def test_bytes_per_entry(self) -> None:
+        closed = closedset.ClosedSet()
+        for i in range(10000):
+            closed[i.to_bytes(8, "little")] = i
+        self.assertLessEqual(closed.bytes_per_entry(), 12 / (closedset.MAX_LOAD / 2))
+        self.assertGreaterEqual(closed.bytes_per_entry(), 12 / closedset.MAX_LOAD)
+
+    def test_search_with_closed_set(self) -> None:
+        for name in ("s4", "s7", "s11"):
+            state, _, depth = SOKOBAN_PROBLEMS[name]
+            state = np.array(state)
+            expected = search.a_star_search(state, goal_test, next_states, h1)
+            goal_node, *counts = search.a_star_search(
+                state, goal_test, next_states, h1, closed=closedset.ClosedSet())
+            self.assertEqual(_get_depth_of_solution(goal_node), depth)
+            self.assertEqual(tuple(counts), expected[1:])
+
+
+class TestSolutionCache(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = solcache.SolutionCache(os.path.join(directory.name, "solutions.db"))
+        self.addCleanup(self.cache.close)
+
+    def test_hit_in_every_orientation(self) -> None:
+        state = np.array(S4)
+        result = hw3.solve(state, h1)
+        self.assertTrue(self.cache.put(state, result))
+        padded = np.pad(state, 2, constant_values=1)
+        for name, f in symmetry.TRANSFORMS.items():
+            image = np.ascontiguousarray(f(padded))
+            hit = self.cache.get(image)
+            self.assertIsNotNone(hit, name)
+            self.assertEqual(hit.depth, result.depth)
+            self.assertEqual(hit.expanded, result.expanded)
+            self.assertTrue(goal_test(hit.states()[-1]))
+        self.assertEqual(len(self.cache), 1)
+
+    def test_bad_entry_is_dropped(self) -> None:
+        state = np.array(S1)
+        result = hw3.solve(state, h1)
+        self.cache.put(state, result._replace(moves=result.moves[:-1]))
+        self.assertIsNone(self.cache.get(state))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_optimal_entries_are_kept(self) -> None:
+        state = np.array(S1)
+        result = hw3.solve(state, h1)
+        self.cache.put(state, result)
+        self.assertFalse(self.cache.put(state, result._replace(moves="x"), optimal=False))
+        self.assertEqual(self.cache.get(state).moves, result.moves)
+
+    def test_wide_level(self) -> None:
+        state = np.ones((3, 300), dtype=int)
+        state[1, 1:-1] = 0
+        state[1, 1:4] = [3, 2, 4]
+        result = hw3.solve(state, h1)
+        self.assertTrue(self.cache.put(state, result))
+        self.assertEqual(self.cache.get(state).moves, result.moves)
+
+    def test_sokoban_and_batch_use_cache(self) -> None:
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            first = hw3.sokoban(S1, h1, cache=self.cache)
+            second = hw3.sokoban(S1, h1, cache=self.cache)
+        self.assertIn("Solution found in cache", out.getvalue())
+        self.assertEqual(first.moves, second.moves)
+        results = sorted(batch.solve_many([S1, S4], h1, workers=1, cache=self.cache))
+        self.assertEqual([r.status for r in results], ["cached", "solved"])
+        self.assertEqual(self.cache.get(S4).depth, results[1].depth)
+        results = list(batch.solve_many([S4], h1, workers=1, cache=self.cache))
+        self.assertEqual(results[0].status, "cached")
+
+
+class TestImport(unittest.TestCase):
+    def _python(self, code: str, *options: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, *options, "-c", code],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    def test_import_is_silent(self) -> None:
+        self.assertEqual(self._python("import hw3").stdout, "")
+
+    def test_import_builds_no_levels(self) -> None:
+        out = self._python(
+            "import sokoban, hw3, levels\n"
+            "print(levels.read_builtin.cache_info().misses, 's1' in vars(hw3),\n"
+            "      len(hw3.levelCache))\n"
+            "hw3.s1\n"
+            "print(levels.read_builtin.cache_info().misses, 's1' in vars(hw3))").stdout
+        self.assertEqual(out.split(), ["0", "False", "0", "1", "False"])
+
+    def test_package_is_lazy(self) -> None:
+        out = self._python(
+            "import sys, sokoban\n"
+            "print('numpy' in sys.modules, 'hw3' in sys.modules)\n"
+            "sokoban.h1\n"
+            "print('hw3' in sys.modules, 'levels' in sys.modules)\n"
+            "sokoban.builtin\n"
+            "print('levels' in sys.modules)").stdout
+        self.assertEqual(out.split(), ["False", "False", "True", "False", "True"])
+
+    def test_builtin_levels(self) -> None:
+        for name, (state, *_) in SOKOBAN_PROBLEMS.items():
+            self.assertEqual(getattr(hw3, name), state)
+            self.assertEqual(levels.builtin()[name].rows, state)
+        self.assertEqual(levels.builtin()["s17"].comments[0], "; [3301278,76]")
+        exported: dict = {}
+        exec("from hw3 import *", exported)
+        self.assertEqual(exported["s19"], hw3.s19)
+        self.assertIn("h905751487", exported)
+        self.assertIsNot(hw3.s1, hw3.s1)
+        levels.builtin()["s1"].rows[1][1] = hw3.wall
+        self.assertEqual(levels.builtin()["s1"].rows, hw3.s1)
+        with self.assertRaises(AttributeError):
+            hw3.s20
+
+
+class TestBench(unittest.TestCase):
+    def test_references(self) -> None:
+        references = bench.references()
+        self.assertEqual(references["s7"], (1738, 50))
+        self.assertEqual(references["s18"], (None, 25))
+        self.assertEqual(len(references), 19)
+
+    def test_run_case(self) -> None:
+        result = bench.run_case("s1", "h1", "astar")
+        self.assertEqual(result["status"], "solved")
+        self.assertEqual((result["depth"], result["expanded"]), (7, 57))
+        self.assertEqual(result["reference_expanded"], 80)
+        self.assertGreater(result["peak_rss"], 0)
+        timed_out = bench.run_case("s17", "h0", "astar", timeout=0.2)
+        self.assertEqual(timed_out["status"], "timeout")
+
+    def test_peak_rss_excludes_runner_memory(self) -> None:
+        ballast = np.ones(256 << 20, dtype=np.uint8)
+        result = bench.run_case("s1", "h1", "astar")
+        self.assertLess(result["peak_rss"], ballast.nbytes)
+
+    def test_compare(self) -> None:
+        baseline = {"results": [bench.run_case("s1", "h1", "astar")]}
+        self.assertEqual(bench.compare(baseline, baseline), [])
+        old = baseline["results"][0]
+        slower = dict(old, seconds=old["seconds"] * 1.2)
+        self.assertEqual(bench.compare({"results": [slower]}, baseline), [])
+        more_nodes = dict(old, expanded=old["expanded"] + 1)
+        self.assertEqual(len(bench.compare({"results": [more_nodes]}, baseline)), 1)
+        wrong = dict(old, depth=8)
+        self.assertEqual(len(bench.compare({"results": [wrong]}, baseline)), 2)
+        lost = dict(old, status="timeout")
+        self.assertIn("was solved", bench.compare({"results": [lost]}, baseline)[0])
+
+
+class TestHooks(unittest.TestCase):
+    def test_events(self) -> None:
+        expanded, generated, goals, reports = [], [], [], []
+        hooks = search.Hooks(progress_interval=0, on_expand=expanded.append,
+                             on_generate=generated.append)
+        hooks.add("on_goal", lambda node, *counts: goals.append(counts))
+        hooks.add("on_progress", reports.append)
+        state = np.array(S7)
+        goal_node, node_generated, node_expanded = search.a_star_search(
+            state, goal_test, next_states, h1, hooks=hooks)
+        self.assertEqual(goals, [(node_generated, node_expanded)])
+        self.assertEqual(len(expanded), node_expanded)
+        self.assertEqual(len(generated) + 1, node_generated)
+        self.assertEqual(len(reports), node_expanded // search.CLOCK_EVERY)
+        last = reports[-1]
+        self.assertEqual(last.expanded, search.CLOCK_EVERY * len(reports))
+        self.assertLessEqual(last.f_bound, _get_depth_of_solution(goal_node))
+        self.assertGreater(last.frontier, 0)
+        self.assertEqual(last.closed, last.expanded)
+        self.assertGreater(last.rate, 0)
+
+    def test_subscriber(self) -> None:
+        class Counter:
+            def __init__(self) -> None:
+                self.expanded = 0
+
+            def on_expand(self, node: search.SearchNode) -> None:
+                self.expanded += 1
+
+        first, second = Counter(), Counter()
+        hooks = search.Hooks()
+        hooks.subscribe(first)
+        hooks.subscribe(second)
+        result = hw3.solve(S4, h1, hooks=hooks)
+        self.assertEqual(first.expanded, result.expanded)
+        self.assertEqual(second.expanded, result.expanded)
+        with self.assertRaises(ValueError):
+            hooks.add("on_finish", print)
+
+
+class TestHotPath(unittest.TestCase):
+    def test_phases(self) -> None:
+        state = np.array(S4)
+        profile = hotpath.profile_search(state, goal_test, next_states, h1)
+        goal_node, generated, expanded = profile.result
+        self.assertEqual(_get_depth_of_solution(goal_node), 13)
+        phases = profile.phases()
+        self.assertEqual(phases["next_states"][1], expanded)
+        self.assertEqual(phases["try_move"][1], 4 * expanded)
+        self.assertEqual(phases["np.copy"][1], 4 * expanded)
+        self.assertEqual(phases["heuristic"][1], generated)
+        self.assertEqual(phases["state_key"][1], generated)
+        for phase in hotpath.PHASES + ("try_move", "np.copy", "engine"):
+            self.assertGreater(phases[phase][0], 0, phase)
+        nested = phases["try_move"][0] + phases["np.copy"][0]
+        self.assertLessEqual(nested, phases["next_states"][0] * 1.05)
+        timed = sum(phases[phase][0] for phase in hotpath.PHASES)
+        self.assertLess(timed, phases["total"][0])
+        self.assertIn("try_move", profile.report())
+
+    def test_total_matches_uninstrumented_run(self) -> None:
+        state = np.array(S4)
+        profiled = []
+        plain = []
+        for _ in range(3):
+            profile = hotpath.profile_search(state, goal_test, next_states, h1)
+            profiled.append(profile.phases()["total"][0])
+            start = time.perf_counter_ns()
+            search.a_star_search(state, goal_test, next_states, h1)
+            plain.append(time.perf_counter_ns() - start)
+        # The best of a few runs keeps scheduler noise out; the timing
+        # overhead removed from the total should leave roughly the
+        # uninstrumented search time.
+        self.assertAlmostEqual(min(profiled), min(plain), delta=min(plain) * 0.5)
+
+    def test_patches_are_undone(self) -> None:
+        try_move, heappush = hw3.try_move, search.heappush
+        hotpath.profile_search(np.array(S1), goal_test, next_states, h0)
+        self.assertIs(hw3.try_move, try_move)
+        self.assertIs(search.heappush, heappush)
+        self.assertIs(hw3.np, np)
+
+
+class TestStats(unittest.TestCase):
+    def test_collect(self) -> None:
+        collector = stats.SearchStats(sample_every=500)
+        goal_node, generated, expanded = search.a_star_search(
+            np.array(S7), goal_test, next_states, h1, hooks=collector.hooks())
+        self.assertEqual(len(collector.samples), expanded // 500 + 1)
+        last = collector.samples[-1]
+        self.assertEqual(last["expanded"], expanded)
+        self.assertEqual(sum(last["f_histogram"].values()), last["frontier"])
+        self.assertEqual(sum(last["g_histogram"].values()), last["frontier"])
+        self.assertEqual(last["closed"], expanded)
+        self.assertGreater(last["duplicate_rate"], 0)
+        summary = collector.summary
+        self.assertEqual(summary["depth"], 50)
+        errors = summary["heuristic_error"]
+        self.assertEqual(len(errors), 51)
+        self.assertTrue(all(e["error"] >= 0 for e in errors))
+        self.assertEqual(errors[-1]["error"], 0)
+        b = summary["branching_factor"]
+        self.assertAlmostEqual(sum(b ** i for i in range(51)), generated, delta=1)
+
+    def test_duplicate_rate_exact(self) -> None:
+        # With h0 the search expands the start, the walk left, the first
+        # push and the step back from it, pops the start a second time,
+        # and then pops the goal: one duplicate out of five non-goal pops.
+        state = np.array([[1, 1, 1, 1, 1, 1, 1],
+                          [1, 0, 3, 2, 0, 4, 1],
+                          [1, 1, 1, 1, 1, 1, 1]])
+        collector = stats.SearchStats(sample_every=1)
+        _, generated, expanded = search.a_star_search(
+            state, goal_test, next_states, h0, hooks=collector.hooks())
+        self.assertEqual((generated, expanded), (8, 4))
+        rates = [s["duplicate_rate"] for s in collector.samples]
+        self.assertEqual(rates, [0.0, 0.0, 0.0, 1 / 5, 1 / 5])
+        self.assertEqual(collector.samples[-1]["frontier"], 2)
+        self.assertEqual(collector.summary["duplicate_rate"], 1 / 5)
+
+    def test_branching_factor_deep_solution(self) -> None:
+        for generated, depth in ((100000, 111), (10 ** 6, 76), (50, 200)):
+            b = stats.branching_factor(generated, depth)
+            self.assertLess(b, 1.2)
+            self.assertAlmostEqual(sum(b ** i for i in range(depth + 1)) / generated, 1, places=4)
+
+    def test_export(self) -> None:
+        collector = stats.SearchStats(sample_every=100)
+        search.a_star_search(np.array(S4), goal_test, next_states, h1, hooks=collector.hooks())
+        out = io.StringIO()
+        collector.to_csv(out)
+        rows = out.getvalue().splitlines()
+        self.assertEqual(rows[0].split(","), stats.FIELDS)
+        self.assertEqual(len(rows), len(collector.samples) + 1)
+        out = io.StringIO()
+        collector.to_json(out)
+        document = json.loads(out.getvalue())
+        self.assertEqual(document["summary"]["depth"], 13)
+
+
+class TestGenerate(unittest.TestCase):
+    def test_reproducible(self) -> None:
+        first = list(generate.family(3, 9, 11, 0.2, 3, seed=5))
+        self.assertEqual(first, list(generate.family(3, 9, 11, 0.2, 3, seed=5)))
+        self.assertNotEqual(first, list(generate.family(3, 9, 11, 0.2, 3, seed=6)))
+
+    def test_shape(self) -> None:
+        for level in generate.family(10, 12, 15, 0.2, 4, seed=1):
+            s = np.array(level)
+            self.assertEqual(s.shape, (12, 15))
+            border = np.concatenate([s[0], s[-1], s[:, 0], s[:, -1]])
+            self.assertTrue(np.all(border == hw3.wall))
+            boxes = np.isin(s, (hw3.box, hw3.boxstar)).sum()
+            goals = np.isin(s, (hw3.star, hw3.boxstar, hw3.keeperstar)).sum()
+            keepers = np.isin(s, (hw3.keeper, hw3.keeperstar)).sum()
+            self.assertEqual((boxes, goals, keepers), (4, 4, 1))
+            self.assertFalse(goal_test(s))
+
+    def test_solvable(self) -> None:
+        for level in generate.family(8, 8, 8, 0.15, 2, seed=3):
+            goal_node, *_ = search.a_star_search(
+                np.array(level), goal_test, next_states, hw3.h905751487,
+                max_expanded=20000)
+            self.assertIsNotNone(goal_node)
+
+    def test_impossible(self) -> None:
+        with self.assertRaisesRegex(ValueError, "100 had too little floor"):
+            generate.generate(5, 5, wall_density=0.0, boxes=5)
+        with self.assertRaisesRegex(ValueError, "pulls must be at least 1"):
+            generate.generate(8, 8, pulls=0)
+        with self.assertRaisesRegex(ValueError, "boxes must be at least 1"):
+            generate.generate(8, 8, boxes=0)
 
 
 def _create_dynamic_simple_sokoban_tester(
@@ -598,31 +1722,31 @@ def _create_dynamic_simple_sokoban_tester(
             )
 
         def test_s1(self) -> None:
-            self._test_problem(S1, 7)
+            self._test_problem(S1, SOKOBAN_PROBLEMS["s1"][2])
 
         def test_s2(self) -> None:
-            self._test_problem(S2, 10)
+            self._test_problem(S2, SOKOBAN_PROBLEMS["s2"][2])
 
         def test_s3(self) -> None:
-            self._test_problem(S3, 12)
+            self._test_problem(S3, SOKOBAN_PROBLEMS["s3"][2])
 
         def test_s4(self) -> None:
-            self._test_problem(S4, 13)
+            self._test_problem(S4, SOKOBAN_PROBLEMS["s4"][2])
 
         def test_s5(self) -> None:
-            self._test_problem(S5, 10)
+            self._test_problem(S5, SOKOBAN_PROBLEMS["s5"][2])
 
         def test_s6(self) -> None:
-            self._test_problem(S6, 12)
+            self._test_problem(S6, SOKOBAN_PROBLEMS["s6"][2])
 
         def test_s7(self) -> None:
-            self._test_problem(S7, 50)
+            self._test_problem(S7, SOKOBAN_PROBLEMS["s7"][2])
 
         def test_s8(self) -> None:
-            self._test_problem(S8, 22)
+            self._test_problem(S8, SOKOBAN_PROBLEMS["s8"][2])
 
         def test_s9(self) -> None:
-            self._test_problem(S9, 41)
+            self._test_problem(S9, SOKOBAN_PROBLEMS["s9"][2])
 
     # Friendlier name for when verbose is enabled.
     TestSokobanSimple.__qualname__ = (
@@ -654,34 +1778,34 @@ def create_dynamic_extreme_sokoban_tester(
             )
 
         def test_s10(self) -> None:
-            self._test_problem(S10, 51)
+            self._test_problem(S10, SOKOBAN_PROBLEMS["s10"][2])
 
         def test_s11(self) -> None:
-            self._test_problem(S11, 48)
+            self._test_problem(S11, SOKOBAN_PROBLEMS["s11"][2])
 
         def test_s12(self) -> None:
-            self._test_problem(S12, 38)
+            self._test_problem(S12, SOKOBAN_PROBLEMS["s12"][2])
 
         def test_s13(self) -> None:
-            self._test_problem(S13, 28)
+            self._test_problem(S13, SOKOBAN_PROBLEMS["s13"][2])
 
         def test_s14(self) -> None:
-            self._test_problem(S14, 53)
+            self._test_problem(S14, SOKOBAN_PROBLEMS["s14"][2])
 
         def test_s15(self) -> None:
-            self._test_problem(S15, 44)
+            self._test_problem(S15, SOKOBAN_PROBLEMS["s15"][2])
 
         def test_s16(self) -> None:
-            self._test_problem(S16, 111)
+            self._test_problem(S16, SOKOBAN_PROBLEMS["s16"][2])
 
         def test_s17(self) -> None:
-            self._test_problem(S17, 76)
+            self._test_problem(S17, SOKOBAN_PROBLEMS["s17"][2])
 
         def test_s18(self) -> None:
-            self._test_problem(S18, 25)
+            self._test_problem(S18, SOKOBAN_PROBLEMS["s18"][2])
 
         def test_s19(self) -> None:
-            self._test_problem(S19, 21)
+            self._test_problem(S19, SOKOBAN_PROBLEMS["s19"][2])
 
     # Friendlier name for when verbose is enabled.
     TestSokobanExtreme.__qualname__ = (
@@ -699,6 +1823,30 @@ STATIC_TEST_SUITES: dict[str, TestCaseClass] = {
     "next_states": TestNextStates,
     "h0": TestH0,
     "h1": TestH1,
+    "hUID": TestHUID,
+    "search": TestSearch,
+    "symmetry": TestSymmetry,
+    "simplify": TestSimplify,
+    "perimeter": TestPerimeter,
+    "batch": TestBatch,
+    "hda": TestHDA,
+    "portfolio": TestPortfolio,
+    "service": TestService,
+    "artifacts": TestArtifacts,
+    "levels": TestLevels,
+    "corpus": TestCorpus,
+    "solve_result": TestSolveResult,
+    "render": TestRender,
+    "checkpoint": TestCheckpoint,
+    "external": TestExternal,
+    "closed_set": TestClosedSet,
+    "solution_cache": TestSolutionCache,
+    "import": TestImport,
+    "bench": TestBench,
+    "hooks": TestHooks,
+    "hotpath": TestHotPath,
+    "stats": TestStats,
+    "generate": TestGenerate,
 }
 
 HEURISTICS: dict[str, HeuristicFunction] = {
@@ -738,6 +1886,29 @@ parser.add_argument(
     action="store_true",
     help="opt into testing the EXTREME Sokoban cases (used with -s)",
 )
+parser.add_argument(
+    "-j", "--jobs",
+    dest="jobs",
+    type=int,
+    nargs="?",
+    const=os.cpu_count(),
+    help="run each Sokoban case in its own subprocess, this many at a "
+         "time (default: number of CPUs), and print a report instead of "
+         "running unittest (used with -s)",
+)
+parser.add_argument(
+    "--timeout",
+    dest="timeout",
+    type=float,
+    default=600.0,
+    help="seconds before a Sokoban case is killed (used with -j)",
+)
+parser.add_argument(
+    "--memory",
+    dest="memory_mib",
+    type=int,
+    help="address-space cap in MiB for each Sokoban case (used with -j)",
+)
 parser.add_argument(
     "-y", "--yes",
     dest="bypass_confirmations",
@@ -770,6 +1941,29 @@ def main() -> None:
         )
         sys.exit(1)
 
+    if args.jobs is not None:
+        if sokoban_heuristic_name is None:
+            print(
+                "Running cases in subprocesses only applies to Sokoban "
+                "test cases (-s).",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        names = SIMPLE_SOKOBAN
+        if run_extreme_sokoban_too:
+            names = SIMPLE_SOKOBAN + EXTREME_SOKOBAN
+        memory_limit = None
+        if args.memory_mib is not None:
+            memory_limit = args.memory_mib * 1024 * 1024
+        all_passed = _run_sokoban_cases_in_subprocesses(
+            HEURISTICS[sokoban_heuristic_name],
+            names,
+            args.jobs,
+            args.timeout,
+            memory_limit,
+        )
+        sys.exit(0 if all_passed else 1)
+
     test_suite_classes = _prepare_test_suites(
         name_of_function_to_test,
         sokoban_heuristic_name,
@@ -850,6 +2044,106 @@ def _run_unit_tests(
     test_runner.run(all_tests_suite)
 
 
+def _run_sokoban_case(
+    name: str,
+    heuristic: HeuristicFunction,
+    memory_limit: Optional[int],
+    results: "multiprocessing.Queue[tuple]",
+) -> None:
+    """Subprocess body: solve one case and report (name, depth,
+    expanded, seconds, error). A search that finds no solution reports
+    "no solution", which counts as a failure."""
+    if memory_limit is not None:
+        batch.limit_memory(memory_limit)
+    start_state, *_ = SOKOBAN_PROBLEMS[name]
+    start = time.perf_counter()
+    try:
+        goal_node, _, expanded = astar.a_star_search(
+            np.array(start_state),
+            goal_test,
+            next_states,
+            heuristic,
+        )
+    except MemoryError:
+        results.put((name, None, None, time.perf_counter() - start,
+                     "out of memory"))
+        return
+    if goal_node is None:
+        results.put((name, None, expanded, time.perf_counter() - start,
+                     "no solution"))
+        return
+    depth = _get_depth_of_solution(goal_node)
+    results.put((name, depth, expanded, time.perf_counter() - start, None))
+
+
+def _run_sokoban_cases_in_subprocesses(
+    heuristic: HeuristicFunction,
+    names: list[str],
+    jobs: int,
+    timeout: float,
+    memory_limit: Optional[int],
+) -> bool:
+    """Run the named Sokoban cases, up to `jobs` at a time, each in its
+    own subprocess with a hard timeout and optional memory cap.
+    Print one report line per case as it finishes and return whether
+    every case found a solution of the documented optimal depth.
+    """
+    results: "multiprocessing.Queue[tuple]" = multiprocessing.Queue()
+    pending = list(names)
+    running: dict[str, tuple[multiprocessing.Process, float]] = {}
+    all_passed = True
+
+    print(f"{'case':<5} {'depth':>5} {'optimal':>7} {'expanded':>9} "
+          f"{'reference':>9} {'seconds':>8}  status")
+
+    def report(name: str, depth: Optional[int], expanded: Optional[int],
+               seconds: float, error: Optional[str]) -> None:
+        nonlocal all_passed
+        _, reference, optimal = SOKOBAN_PROBLEMS[name]
+        status = error or ("ok" if depth == optimal else "WRONG DEPTH")
+        all_passed = all_passed and status == "ok"
+        print(f"{name:<5} {_blank_if_none(depth):>5} {optimal:>7} "
+              f"{_blank_if_none(expanded):>9} "
+              f"{_blank_if_none(reference):>9} {seconds:>8.2f}  {status}",
+              flush=True)
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            name = pending.pop(0)
+            process = multiprocessing.Process(
+                target=_run_sokoban_case,
+                args=(name, heuristic, memory_limit, results),
+                daemon=True,
+            )
+            process.start()
+            running[name] = (process, time.monotonic())
+        try:
+            name, depth, expanded, seconds, error = results.get(timeout=0.1)
+        except queue.Empty:
+            now = time.monotonic()
+            for name, (process, started) in list(running.items()):
+                if now - started > timeout:
+                    process.kill()
+                    error = "timed out"
+                elif not process.is_alive() and results.empty():
+                    error = f"died (exit code {process.exitcode})"
+                else:
+                    continue
+                process.join()
+                del running[name]
+                report(name, None, None, now - started, error)
+            continue
+        process, _ = running.pop(name)
+        process.join()
+        report(name, depth, expanded, seconds, error)
+
+    return all_passed
+
+
+def _blank_if_none(value: Optional[int]) -> str:
+    return "" if value is None else str(value)
+
+
 if __name__ == "__main__":
     main()
 